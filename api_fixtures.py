@@ -0,0 +1,204 @@
+import os
+import gzip
+import time
+import zlib
+import logging
+import threading
+import numpy as np
+import pandas as pd
+import orjson
+from datetime import datetime
+from typing import Dict, Optional
+from config import Config
+
+logger = logging.getLogger(__name__)
+
+
+def fixture_path(fixture_dir: str, security_id, exchange_segment: str, interval) -> str:
+    return os.path.join(fixture_dir, f"{exchange_segment}_{security_id}_{interval}m.json.gz")
+
+
+IST_OFFSET = 5 * 3600 + 30 * 60
+
+
+def failure_response(remarks: str) -> Dict:
+    """Same shape dhanhq returns when a request fails"""
+    return {'status': 'failure', 'remarks': remarks, 'data': ''}
+
+
+class RecordingClient:
+    """Wraps a live dhanhq client and saves every intraday_minute_data response as a fixture"""
+
+    def __init__(self, client, fixture_dir: Optional[str] = None):
+        self._client = client
+        self.fixture_dir = fixture_dir or Config.API_FIXTURE_DIR
+        os.makedirs(self.fixture_dir, exist_ok=True)
+
+    def __getattr__(self, name):
+        return getattr(self._client, name)
+
+    def intraday_minute_data(self, security_id, exchange_segment, instrument_type, from_date, to_date,
+                             interval=1):
+        response = self._client.intraday_minute_data(
+            security_id=security_id, exchange_segment=exchange_segment,
+            instrument_type=instrument_type, from_date=from_date, to_date=to_date, interval=interval)
+        if response.get('status') == 'success':
+            path = fixture_path(self.fixture_dir, security_id, exchange_segment, interval)
+            fixture = {
+                'request': {'security_id': security_id, 'exchange_segment': exchange_segment,
+                            'instrument_type': instrument_type, 'from_date': from_date,
+                            'to_date': to_date, 'interval': interval},
+                'recorded_at': datetime.now().isoformat(timespec='seconds'),
+                'response': response,
+            }
+            tmp = path + ".tmp"
+            with gzip.open(tmp, 'wb', compresslevel=6) as f:
+                f.write(orjson.dumps(fixture, option=orjson.OPT_SERIALIZE_NUMPY))
+            os.replace(tmp, path)
+            logger.info(f"Recorded fixture {path}")
+        return response
+
+
+class ReplayClient:
+    """Local stand-in for dhanhq that serves recorded fixtures.
+
+    Adds `latency_ms` (+ uniform `jitter_ms`) per call and fails a seeded `error_rate`
+    share of calls with a dhanhq-style failure response. A fixture serves the requested span
+    of days ending on its recorded to_date, sliced to that window; a longer span than was
+    recorded is a failure, never the wrong bars. With `synthetic=True`, security
+    IDs without a fixture get a deterministic random-walk session per business day, on a
+    calendar anchored at Config.REPLAY_ANCHOR_DATE.
+    """
+
+    def __init__(self, fixture_dir: Optional[str] = None, latency_ms: Optional[float] = None,
+                 jitter_ms: Optional[float] = None, error_rate: Optional[float] = None,
+                 seed: Optional[int] = None, synthetic: Optional[bool] = None):
+        self.fixture_dir = fixture_dir or Config.API_FIXTURE_DIR
+        self.latency_ms = Config.REPLAY_LATENCY_MS if latency_ms is None else latency_ms
+        self.jitter_ms = Config.REPLAY_JITTER_MS if jitter_ms is None else jitter_ms
+        self.error_rate = Config.REPLAY_ERROR_RATE if error_rate is None else error_rate
+        self.synthetic = Config.REPLAY_SYNTHETIC if synthetic is None else synthetic
+        self._rng = np.random.default_rng(Config.REPLAY_SEED if seed is None else seed)
+        self._rng_lock = threading.Lock()
+        self._cache: Dict[str, Dict] = {}
+        self.calls = 0
+        self.injected_errors = 0
+
+    def _load(self, path: str) -> Optional[Dict]:
+        if path not in self._cache:
+            if not os.path.exists(path):
+                return None
+            with gzip.open(path, 'rb') as f:
+                self._cache[path] = orjson.loads(f.read())
+        return self._cache[path]
+
+    @staticmethod
+    def _window(fixture: Dict, from_date: str, to_date: str) -> Dict:
+        """The recorded bars for the requested span of days, ending on the recorded to_date"""
+        recorded = fixture['request']
+        rec_start = pd.Timestamp(recorded['from_date']).normalize()
+        end = pd.Timestamp(recorded['to_date']).normalize()
+        start = end - (pd.Timestamp(to_date).normalize() - pd.Timestamp(from_date).normalize())
+        if start < rec_start:
+            return failure_response(
+                f"Fixture for {recorded['exchange_segment']} {recorded['security_id']} covers "
+                f"{rec_start.date()}..{end.date()}; requested {(end - start).days} days back from {end.date()}")
+
+        data = fixture['response']['data']
+        day = (np.asarray(data['timestamp'], dtype=np.float64).astype(np.int64) + IST_OFFSET) // 86400
+        lo, hi = (ts.value // 86_400_000_000_000 for ts in (start, end))
+        rows = np.flatnonzero((day >= lo) & (day <= hi))
+        return {**fixture['response'], 'data': {k: [v[i] for i in rows] for k, v in data.items()}}
+
+    @staticmethod
+    def _synthetic_response(security_id, from_date: str, to_date: str) -> Dict:
+        start, end = pd.Timestamp(from_date).normalize(), pd.Timestamp(to_date).normalize()
+        if Config.REPLAY_ANCHOR_DATE:
+            # Same span of days, but ending on the anchor so runs on different days see the same bars
+            anchor = pd.Timestamp(Config.REPLAY_ANCHOR_DATE)
+            start, end = anchor - (end - start), anchor
+
+        # Day-level walk from a fixed origin, then each requested day's minutes from its own seed,
+        # so a day's bars do not depend on the window requested and cost scales with the window
+        seed = zlib.crc32(str(security_id).encode())
+        rng = np.random.default_rng(seed)
+        days = pd.bdate_range(end - pd.Timedelta(days=Config.REPLAY_HISTORY_DAYS), end)
+        day_moves = rng.normal(0, 0.0008 * np.sqrt(375), len(days))
+        day_open = rng.uniform(100, 2000) * np.exp(np.cumsum(day_moves) - day_moves)
+        kept = np.flatnonzero(days >= start)
+
+        session = pd.timedelta_range(start='9h15min', periods=375, freq='1min')
+        local = (days.values[kept, None] + session.values[None, :]).ravel()
+        epoch = local.astype('datetime64[s]').astype(np.int64) - IST_OFFSET
+        close, spread, volume = [], [], []
+        for k in kept:
+            day_rng = np.random.default_rng([seed, int(days[k].value // 86_400_000_000_000)])
+            steps = day_rng.normal(0, 0.0008, 375)
+            steps += (day_moves[k] - steps.sum()) / 375  # the session ends where the day walk does
+            path = day_open[k] * np.exp(np.cumsum(steps))
+            close.append(path)
+            spread.append(path * np.abs(day_rng.normal(0, 0.0006, 375)))
+            volume.append(day_rng.integers(100, 50_000, 375))
+        close = np.concatenate(close) if close else np.empty(0)
+        spread = np.concatenate(spread) if spread else np.empty(0)
+        volume = np.concatenate(volume) if volume else np.empty(0, dtype=np.int64)
+        open_ = np.append(day_open[kept[:1]], close[:-1])
+        return {
+            'status': 'success',
+            'remarks': '',
+            'data': {
+                'open': np.round(open_, 2).tolist(),
+                'high': np.round(np.maximum(open_, close) + spread, 2).tolist(),
+                'low': np.round(np.minimum(open_, close) - spread, 2).tolist(),
+                'close': np.round(close, 2).tolist(),
+                'volume': volume.tolist(),
+                'timestamp': epoch.astype(np.float64).tolist(),  # Dhan sends epoch seconds as floats
+            },
+        }
+
+    def intraday_minute_data(self, security_id, exchange_segment, instrument_type, from_date, to_date,
+                             interval=1):
+        with self._rng_lock:
+            self.calls += 1
+            delay = self.latency_ms + self.jitter_ms * self._rng.random()
+            fail = self._rng.random() < self.error_rate
+            self.injected_errors += fail
+        if delay > 0:
+            time.sleep(delay / 1000)
+        if fail:
+            return failure_response("Injected replay error")
+
+        fixture = self._load(fixture_path(self.fixture_dir, security_id, exchange_segment, interval))
+        if fixture is not None:
+            return self._window(fixture, from_date, to_date)
+        if self.synthetic:
+            return self._synthetic_response(security_id, from_date, to_date)
+        return failure_response(f"No fixture for {exchange_segment} {security_id} {interval}m")
+
+
+def build_client(live_factory):
+    """dhanhq client for Config.DHAN_API_MODE: live, record (live + save fixtures) or replay"""
+    mode = Config.DHAN_API_MODE
+    if mode == 'replay':
+        logger.info(f"Dhan API in replay mode from {Config.API_FIXTURE_DIR}")
+        return ReplayClient()
+    if mode == 'record':
+        return RecordingClient(live_factory())
+    if mode != 'live':
+        raise ValueError(f"Unknown DHAN_API_MODE '{mode}', expected live, record or replay")
+    return live_factory()
+
+
+if __name__ == '__main__':
+    # python api_fixtures.py SYMBOL [SYMBOL ...]  — record live responses for offline replay
+    import sys
+    from dhanhq import dhanhq
+    from dhan_client import DhanClient
+
+    logging.basicConfig(level=logging.INFO)
+    client = DhanClient()
+    client.client = RecordingClient(dhanhq(Config.DHAN_CLIENT_ID, Config.DHAN_ACCESS_TOKEN))
+    for symbol in sys.argv[1:] or Config.WATCHLIST_STOCKS:
+        security_id = client.get_security_id(symbol)
+        if security_id:
+            client.get_historical_data(security_id)
@@ -0,0 +1,97 @@
+import threading
+import time
+import logging
+from typing import Dict
+from config import Config
+
+logger = logging.getLogger(__name__)
+
+
+class AppServices:
+    """Heavy components (pandas, dhanhq, strategy, backtester) built once, off the import path"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._ready = threading.Event()
+        self.created_at = time.monotonic()
+        self.ready_seconds = None
+        self.error = None
+        self.restored = False
+
+    @property
+    def is_ready(self) -> bool:
+        return self._ready.is_set()
+
+    def warm_up_in_background(self):
+        threading.Thread(target=self._safe_build, name="warm-up", daemon=True).start()
+
+    def _safe_build(self):
+        try:
+            self.get()
+        except Exception as e:
+            logger.error(f"Background warm-up failed: {e}")
+
+    def get(self) -> 'AppServices':
+        """Build components on first call (blocking); later calls return immediately"""
+        if self._ready.is_set():
+            return self
+        with self._lock:
+            if self._ready.is_set():
+                return self
+            try:
+                self._build()
+            except Exception as e:
+                self.error = str(e)
+                raise
+            self.ready_seconds = round(time.monotonic() - self.created_at, 3)
+            self._ready.set()
+            logger.info(f"Services ready in {self.ready_seconds}s (warm state restored: {self.restored})")
+        return self
+
+    def _build(self):
+        from strategy import TradingStrategy
+        from backtest import BacktestEngine
+        from dhan_client import DhanClient
+        from trade_ledger import TradeLedger
+        from chart_feed import ChartFeed
+        from candle_store import CandleStore
+        from screener import UniverseScreener
+        from warm_state import load_snapshot
+
+        self.dhan_client = DhanClient()
+        self.strategy = TradingStrategy()
+        self.trade_ledger = TradeLedger()
+        self.backtest_engine = BacktestEngine(self.strategy, ledger=self.trade_ledger,
+                                              dhan_client=self.dhan_client)
+        self.chart_feed = ChartFeed(self.dhan_client, self.strategy)
+        self.candle_store = CandleStore()
+        self.screener = UniverseScreener(self.candle_store, self.dhan_client)
+
+        snapshot = load_snapshot() if Config.WARM_STATE_ENABLED else None
+        if snapshot:
+            self.dhan_client.security_id_cache.update(snapshot['security_ids'])
+            self.chart_feed.restore(snapshot['series'])
+            self.restored = True
+
+        # Only needed for symbols the snapshot did not resolve; load it now, still off the request path
+        if any(s not in self.dhan_client.security_id_cache for s in Config.WATCHLIST_STOCKS):
+            self.dhan_client.instruments
+
+    def save_warm_state(self):
+        if not self._ready.is_set() or not Config.WARM_STATE_ENABLED:
+            return
+        from warm_state import save_snapshot
+        try:
+            save_snapshot(self.dhan_client.security_id_cache, self.chart_feed.series)
+        except Exception as e:
+            logger.warning(f"Could not save warm state: {e}")
+
+    def status(self) -> Dict:
+        return {
+            'status': 'ready' if self.is_ready else ('error' if self.error else 'starting'),
+            'ready': self.is_ready,
+            'uptime_seconds': round(time.monotonic() - self.created_at, 3),
+            'ready_seconds': self.ready_seconds,
+            'warm_state_restored': self.restored,
+            'error': self.error,
+        }
@@ -1,198 +1,225 @@
+import numpy as np
 import pandas as pd
-from datetime import time
-from typing import List, Dict
+from datetime import date, time
+from typing import List, Dict, Optional
 from config import Config
 from strategy import TradingStrategy
 from dhan_client import DhanClient
+from trade_ledger import TradeLedger
+from exit_kernel import candle_arrays, simulate_exits, EXIT_REASONS, EOD_EXIT, NO_EXIT, TARGET_HIT
+from cost_model import CostModel, IndianIntradayCostModel
+from performance import performance_report, trade_arrays
 
 class BacktestEngine:
-    def __init__(self, strategy: TradingStrategy):
+    def __init__(self, strategy: TradingStrategy, ledger: Optional[TradeLedger] = None,
+                 cost_model: Optional[CostModel] = None, dhan_client: Optional[DhanClient] = None):
         self.strategy = strategy
+        self.dhan_client = dhan_client  # tick sizes from the instrument index
         self.config = Config()
+        self.ledger = ledger
+        self.cost_model = cost_model or IndianIntradayCostModel()
         self.trades = {}
         self.daily_trades = {}
+        self.trade_arrays = {}  # symbol -> columnar closed trades from the last run
 
-    def run_backtest(self, df: pd.DataFrame, symbol: str) -> Dict:
+    def run_backtest(self, df: pd.DataFrame, symbol: str, since: Optional[date] = None,
+                     source: str = "backtest") -> Dict:
+        """Backtest every session in `df`, or only sessions on/after `since` (earlier bars warm up SMA_50)"""
         if df is None or df.empty:
             return {'error': 'No data provided for backtest'}
 
         print(f"\n=== Backtest Starting for {symbol} ===")
-        df = self.strategy.analyze_candle_data(df)
-        trades = []
+        df = self.strategy.analyze_candle_data(df).reset_index(drop=True)
         daily_trades = {}
-        i = 0
-        last_trade_date = {}
-
-        while i < len(df):
-            row = df.iloc[i]
-            trade_date = row['timestamp'].date()
 
-            if symbol in last_trade_date and last_trade_date[symbol] == trade_date:
-                i += 1
+        # One pass per trading session: each session is independent of the others
+        tick_size = self.dhan_client.tick_size(symbol) if self.dhan_client else None
+        entries = []
+        sessions = self._session_index(df)
+        if since is not None and len(sessions):
+            session_dates = df['timestamp'].iloc[sessions[:, 0]].dt.date.to_numpy()
+            sessions = sessions[session_dates >= since]
+        for start, end, setup_index in sessions:
+            if setup_index < 0:
                 continue
+            entry = self._run_session(df, end, setup_index, tick_size)
+            if entry:
+                entries.append(entry)
+
+        # All exits are resolved in a single batched kernel call
+        trades = self._simulate_trades(df, entries, symbol)
+        for trade in trades:
+            daily_trades[trade['entry_time'].date().isoformat()] = trade
+
+        if self.ledger is not None:
+            self.ledger.append(trades, source=source)
 
-            signal = self.strategy.check_10am_signal(df, i)
-            if signal:
-                rejection = self.strategy.find_rejection_candle(df, i, signal)
-                if rejection:
-                    rej_idx = rejection['index']
-                    trade_params = self.strategy.calculate_entry_exit(rejection, signal)
-
-                    entry_index = rej_idx + 3
-                    if entry_index >= len(df):
-                        i += 1
-                        continue
-
-                    # ✅ Check if any of the next 3 candles touch SMA_50
-                    sma_touched = False
-                    for j in range(rej_idx + 1, entry_index):
-                        row_j = df.iloc[j]
-                        sma = row_j.get('SMA_50', None)
-                        if pd.isna(sma):
-                            continue
-                        if signal == "LONG_SETUP" and row_j['low'] <= sma:
-                            sma_touched = True
-                            break
-                        elif signal == "SHORT_SETUP" and row_j['high'] >= sma:
-                            sma_touched = True
-                            break
-
-                    if sma_touched:
-                        i = entry_index
-                        continue
-
-                    # Skip trade if wick hits SL before entry
-                    sl = trade_params['stop_loss']
-                    pre_entry_slice = df.iloc[rej_idx+1 : entry_index]
-                    if signal == "LONG_SETUP" and (pre_entry_slice['low'] <= sl).any():
-                        i = entry_index
-                        continue
-                    elif signal == "SHORT_SETUP" and (pre_entry_slice['high'] >= sl).any():
-                        i = entry_index
-                        continue
-
-                    # Skip entry if after 1PM
-                    entry_time = df.iloc[entry_index]['timestamp']
-                    if entry_time.time() > self.config.NO_ENTRY_AFTER:
-                        i = entry_index
-                        continue
-                    
-                    if pd.isna(df.iloc[entry_index].get('SMA_50')):
-                        i = entry_index
-                        continue
-                    # Simulate trade
-                    trade_result = self._simulate_trade(df, entry_index, trade_params, signal, symbol)
-                    if trade_result:
-                        trades.append(trade_result)
-                        last_trade_date[symbol] = trade_date
-                        daily_trades[trade_date] = trade_result
-                        i = trade_result['exit_index']
-                        continue
-            i += 1
-
-        self.trades[symbol] = self._calculate_performance_metrics(trades)
+        self.trades[symbol] = self._calculate_performance_metrics(trades, symbol)
         self.daily_trades[symbol] = daily_trades
         print(f"[{symbol}] Backtest Completed → {self.trades[symbol]}")
         result = self.trades[symbol]
         result['daily_trades'] = list(daily_trades.values())
         return result
 
-    def _simulate_trade(self, df: pd.DataFrame, entry_index: int,
-                        trade_params: Dict, signal: str, symbol: str) -> Dict:
-        entry_price = trade_params['entry_price']
-        stop_loss = trade_params['stop_loss']
-        target_price = trade_params['target_price']
-
-        trade = {
-            'symbol': symbol,
-            'signal': signal,
-            'entry_index': entry_index,
-            'entry_time': df.iloc[entry_index]['timestamp'],
-            'entry_price': entry_price,
-            'stop_loss': stop_loss,
-            'target_price': target_price,
-            'quantity': 100,
-            'status': 'OPEN'
-        }
-
-        for i in range(entry_index, len(df)):
-            candle = df.iloc[i]
-            candle_time = candle['timestamp'].time()
-
-            if candle_time >= self.config.EXIT_ALL_TIME:
-                trade.update({
-                    'exit_index': i,
-                    'exit_time': candle['timestamp'],
-                    'exit_price': candle['close'],
-                    'exit_reason': 'EOD_EXIT',
-                    'status': 'CLOSED'
-                })
-                break
-
-            if signal == "LONG_SETUP":
-                if candle['high'] >= target_price:
-                    trade.update({
-                        'exit_index': i,
-                        'exit_time': candle['timestamp'],
-                        'exit_price': target_price,
-                        'exit_reason': 'TARGET_HIT',
-                        'status': 'CLOSED'
-                    })
-                    break
-                elif candle['low'] <= stop_loss:
-                    trade.update({
-                        'exit_index': i,
-                        'exit_time': candle['timestamp'],
-                        'exit_price': stop_loss,
-                        'exit_reason': 'STOP_LOSS',
-                        'status': 'CLOSED'
-                    })
-                    break
-            else:
-                if candle['low'] <= target_price:
-                    trade.update({
-                        'exit_index': i,
-                        'exit_time': candle['timestamp'],
-                        'exit_price': target_price,
-                        'exit_reason': 'TARGET_HIT',
-                        'status': 'CLOSED'
-                    })
-                    break
-                elif candle['high'] >= stop_loss:
-                    trade.update({
-                        'exit_index': i,
-                        'exit_time': candle['timestamp'],
-                        'exit_price': stop_loss,
-                        'exit_reason': 'STOP_LOSS',
-                        'status': 'CLOSED'
-                    })
-                    break
-
-        if trade['status'] == 'CLOSED':
-            pnl = (trade['exit_price'] - trade['entry_price']) * trade['quantity'] \
-                  if signal == "LONG_SETUP" else \
-                  (trade['entry_price'] - trade['exit_price']) * trade['quantity']
-            trade['pnl'] = round(pnl, 2)
-            return trade
-        return None
-
-    def _calculate_performance_metrics(self, trades: List[Dict]) -> Dict:
+    @staticmethod
+    def _session_index(df: pd.DataFrame) -> np.ndarray:
+        """(start, end, 10:00 candle index or -1) per trading day, from integer searches"""
+        local = df['timestamp']
+        if local.dt.tz is not None:
+            local = local.dt.tz_localize(None)
+        minutes = local.to_numpy(dtype='datetime64[m]').astype(np.int64)
+        days = minutes // 1440
+
+        starts = np.flatnonzero(np.diff(days, prepend=days[0] - 1))
+        ends = np.append(starts[1:], len(days))
+
+        # minutes is sorted, so each day's 10:00 bar is one binary search away
+        targets = days[starts] * 1440 + 10 * 60
+        setup = np.searchsorted(minutes, targets)
+        found = (setup < ends) & (minutes[np.minimum(setup, len(minutes) - 1)] == targets)
+        return np.column_stack([starts, ends, np.where(found, setup, -1)])
+
+    def _run_session(self, df: pd.DataFrame, end: int, i: int,
+                     tick_size: Optional[float] = None) -> Optional[Dict]:
+        """Entry for the 10 AM setup at index `i` within a session ending (exclusive) at `end`"""
+        signal = self.strategy.check_10am_signal(df, i)
+        if not signal:
+            return None
+
+        rejection = self.strategy.find_rejection_candle(df.iloc[:end], i, signal)
+        if not rejection:
+            return None
+
+        rej_idx = rejection['index']
+        trade_params = self.strategy.calculate_entry_exit(rejection, signal, tick_size)
+
+        entry_index = rej_idx + 3
+        if entry_index >= end:
+            return None
+
+        # ✅ Check if any of the next 3 candles touch SMA_50
+        for j in range(rej_idx + 1, entry_index):
+            row_j = df.iloc[j]
+            sma = row_j.get('SMA_50', None)
+            if pd.isna(sma):
+                continue
+            if signal == "LONG_SETUP" and row_j['low'] <= sma:
+                return None
+            elif signal == "SHORT_SETUP" and row_j['high'] >= sma:
+                return None
+
+        # Skip trade if wick hits SL before entry
+        sl = trade_params['stop_loss']
+        pre_entry_slice = df.iloc[rej_idx+1 : entry_index]
+        if signal == "LONG_SETUP" and (pre_entry_slice['low'] <= sl).any():
+            return None
+        elif signal == "SHORT_SETUP" and (pre_entry_slice['high'] >= sl).any():
+            return None
+
+        # Skip entry if after 1PM
+        entry_time = df.iloc[entry_index]['timestamp']
+        if entry_time.time() > self.config.NO_ENTRY_AFTER:
+            return None
+
+        if pd.isna(df.iloc[entry_index].get('SMA_50')):
+            return None
+
+        return {'entry_index': entry_index, 'end_index': end, 'signal': signal, **trade_params}
+
+    def _simulate_trades(self, df: pd.DataFrame, entries: List[Dict], symbol: str) -> List[Dict]:
+        """Resolve target / stop / EOD exits for all entries with the compiled exit kernel"""
+        if not entries:
+            return []
+
+        arrays = candle_arrays(df)
+        entry_idx = np.array([e['entry_index'] for e in entries], dtype=np.int64)
+        end_idx = np.array([e['end_index'] for e in entries], dtype=np.int64)
+        exit_idx, exit_price, reason = simulate_exits(
+            arrays, entry_idx, end_idx,
+            [e['stop_loss'] for e in entries], [e['target_price'] for e in entries],
+            [e['signal'] == "LONG_SETUP" for e in entries],
+            self.config.EXIT_ALL_TIME,
+        )
+
+        # Session ended early (e.g. half-day) with the next session in the data: square off
+        square_off = (reason == NO_EXIT) & (end_idx < len(df))
+        exit_idx[square_off] = end_idx[square_off] - 1
+        exit_price[square_off] = arrays['close'][exit_idx[square_off]]
+        reason[square_off] = EOD_EXIT
+
+        closed = np.flatnonzero(reason != NO_EXIT)
+        if not len(closed):
+            return []
+        entry_idx, exit_idx, exit_price, reason = entry_idx[closed], exit_idx[closed], exit_price[closed], reason[closed]
+        entries = [entries[k] for k in closed]
+
+        # Gross PnL and costs for the whole trade set as array operations
+        quantity = np.full(len(entries), self.config.TRADE_QUANTITY, dtype=np.int64)
+        side = np.array([1.0 if e['signal'] == "LONG_SETUP" else -1.0 for e in entries])
+        entry_price = np.array([e['entry_price'] for e in entries], dtype=np.float64)
+        gross_pnl = side * (exit_price - entry_price) * quantity
+        bar_range = arrays['high'] - arrays['low']
+        costs = self.cost_model.apply(
+            side=side, quantity=quantity, entry_price=entry_price, exit_price=exit_price,
+            gross_pnl=gross_pnl, entry_range=bar_range[entry_idx], exit_range=bar_range[exit_idx],
+            entry_volume=arrays['volume'][entry_idx], exit_volume=arrays['volume'][exit_idx],
+            exit_is_limit=reason == TARGET_HIT,
+        )
+        slippage = np.round(costs['slippage'], 2)
+        charges = np.round(costs['charges'], 2)
+        net_pnl = np.round(costs['net_pnl'], 2)
+
+        timestamps = df['timestamp']
+        trades = []
+        for k, e in enumerate(entries):
+            trade = {
+                'symbol': symbol,
+                'signal': e['signal'],
+                'entry_index': e['entry_index'],
+                'entry_time': timestamps.iat[e['entry_index']],
+                'entry_price': e['entry_price'],
+                'stop_loss': e['stop_loss'],
+                'target_price': e['target_price'],
+                'quantity': int(quantity[k]),
+                'status': 'CLOSED',
+                'exit_index': int(exit_idx[k]),
+                'exit_time': timestamps.iat[exit_idx[k]],
+                'exit_price': float(exit_price[k]),
+                'exit_reason': EXIT_REASONS[reason[k]],
+            }
+            trade['pnl'] = round(float(gross_pnl[k]), 2)
+            trade['slippage'] = float(slippage[k])
+            trade['charges'] = float(charges[k])
+            trade['net_pnl'] = float(net_pnl[k])
+            trades.append(trade)
+        return trades
+
+    def _calculate_performance_metrics(self, trades: List[Dict], symbol: Optional[str] = None) -> Dict:
         closed_trades = [t for t in trades if t.get('status') == 'CLOSED']
         if not closed_trades:
             return {'error': 'No closed trades'}
 
-        total_trades = len(closed_trades)
-        winning_trades = [t for t in closed_trades if t.get('pnl', 0) > 0]
-        losing_trades = [t for t in closed_trades if t.get('pnl', 0) < 0]
-
-        total_pnl = sum(t.get('pnl', 0) for t in closed_trades)
-        win_rate = (len(winning_trades) / total_trades) * 100 if total_trades > 0 else 0
+        arrays = trade_arrays(closed_trades)
+        if symbol is not None:
+            self.trade_arrays[symbol] = arrays
+        gross = performance_report(arrays, pnl_field='pnl')
+        net = performance_report(arrays, pnl_field='net_pnl')
 
         return {
-            'total_trades': total_trades,
-            'winning_trades': len(winning_trades),
-            'losing_trades': len(losing_trades),
-            'win_rate': round(win_rate, 2),
-            'total_pnl': round(total_pnl, 2),
+            'total_trades': gross['total_trades'],
+            'winning_trades': gross['winning_trades'],
+            'losing_trades': gross['losing_trades'],
+            'win_rate': gross['win_rate'],
+            'total_pnl': gross['total_pnl'],
+            'net_pnl': net['total_pnl'],
+            'net_win_rate': net['win_rate'],
+            'total_charges': round(float(arrays['charges'].sum()), 2),
+            'total_slippage': round(float(arrays['slippage'].sum()), 2),
+            'max_drawdown': net['max_drawdown'],
+            'sharpe_ratio': net['sharpe_ratio'],
+            'sortino_ratio': net['sortino_ratio'],
+            'profit_factor': net['profit_factor'],
+            'max_win_streak': net['max_win_streak'],
+            'max_loss_streak': net['max_loss_streak'],
             'trades': closed_trades[-10:]
         }
\ No newline at end of file
@@ -0,0 +1,95 @@
+import os
+import threading
+import logging
+from concurrent.futures import ThreadPoolExecutor
+import numpy as np
+import pandas as pd
+from typing import Dict, Iterable, List, Optional
+from config import Config
+from serialization import epoch_seconds
+
+logger = logging.getLogger(__name__)
+
+FIELDS = ('t', 'o', 'h', 'l', 'c', 'v')
+
+
+class CandleStore:
+    """On-disk 3-minute candles, one compressed column file (.npz) per symbol"""
+
+    def __init__(self, path: Optional[str] = None):
+        self.path = path or Config.CANDLE_STORE_DIR
+        os.makedirs(self.path, exist_ok=True)
+        self._lock = threading.Lock()
+
+    def _file(self, symbol: str) -> str:
+        return os.path.join(self.path, f"{symbol.strip().upper()}.npz")
+
+    def symbols(self) -> List[str]:
+        return sorted(f[:-4] for f in os.listdir(self.path) if f.endswith('.npz'))
+
+    def load(self, symbol: str, fields=FIELDS) -> Optional[Dict[str, np.ndarray]]:
+        file = self._file(symbol)
+        if not os.path.exists(file):
+            return None
+        with np.load(file) as data:
+            return {k: data[k] for k in fields}
+
+    def append(self, symbol: str, df: pd.DataFrame) -> int:
+        """Merge candles into the symbol's file; rows at an existing timestamp are replaced"""
+        if df is None or df.empty:
+            return 0
+        incoming = {
+            't': epoch_seconds(df['timestamp']),
+            'o': df['open'].to_numpy(dtype=np.float64),
+            'h': df['high'].to_numpy(dtype=np.float64),
+            'l': df['low'].to_numpy(dtype=np.float64),
+            'c': df['close'].to_numpy(dtype=np.float64),
+            'v': df['volume'].to_numpy(dtype=np.float64),
+        }
+        with self._lock:
+            existing = self.load(symbol)
+            if existing is not None:
+                keep = ~np.isin(existing['t'], incoming['t'])
+                merged = {k: np.concatenate([existing[k][keep], incoming[k]]) for k in FIELDS}
+            else:
+                merged = incoming
+            order = np.argsort(merged['t'], kind='stable')
+            merged = {k: v[order] for k, v in merged.items()}
+
+            tmp = self._file(symbol) + ".tmp.npz"
+            np.savez_compressed(tmp, **merged)
+            os.replace(tmp, self._file(symbol))
+        return len(incoming['t'])
+
+    def to_frame(self, symbol: str) -> Optional[pd.DataFrame]:
+        """DataFrame in the shape DhanClient.get_historical_data returns"""
+        data = self.load(symbol)
+        if data is None:
+            return None
+        return pd.DataFrame({
+            'timestamp': pd.to_datetime(data['t'], unit='s', utc=True).tz_convert('Asia/Kolkata'),
+            'open': data['o'], 'high': data['h'], 'low': data['l'],
+            'close': data['c'], 'volume': data['v'],
+        })
+
+    def load_panel(self, symbols: Iterable[str], bars: int, fields=('c', 'v'),
+                   as_of: Optional[int] = None) -> Dict[str, np.ndarray]:
+        """Last `bars` candles (at or before `as_of`) per symbol as (n_symbols x bars) matrices, NaN-padded"""
+        symbols = list(symbols)
+        panel = {f: np.full((len(symbols), bars), np.nan) for f in fields}
+        panel['t_last'] = np.zeros(len(symbols), dtype=np.int64)
+        # File reads and zlib inflation release the GIL, so a thread pool overlaps them
+        with ThreadPoolExecutor(max_workers=Config.CANDLE_STORE_READ_WORKERS) as pool:
+            loaded = pool.map(lambda s: self.load(s, ('t',) + tuple(fields)), symbols)
+        for row, data in enumerate(loaded):
+            if data is None:
+                continue
+            end = len(data['t']) if as_of is None else int(np.searchsorted(data['t'], as_of, side='right'))
+            n = min(bars, end)
+            if n == 0:
+                continue
+            for f in fields:
+                panel[f][row, bars - n:] = data[f][end - n:end]
+            panel['t_last'][row] = data['t'][end - 1]
+        panel['symbols'] = np.array(symbols)
+        return panel
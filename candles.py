@@ -0,0 +1,55 @@
+import numpy as np
+import pandas as pd
+from typing import Dict, List, Optional
+
+
+class CandleRow:
+    """Read-only view of one bar; supports the row-wise `candles[i]['close']` access style"""
+    __slots__ = ('_candles', '_index')
+
+    def __init__(self, candles: 'CandleArray', index: int):
+        self._candles = candles
+        self._index = index
+
+    def __getitem__(self, key: str):
+        if key == 'timestamp':
+            return self._candles.timestamps[self._index]
+        return self._candles.columns[key][self._index]
+
+    def get(self, key: str, default=None):
+        try:
+            return self[key]
+        except KeyError:
+            return default
+
+
+class CandleArray:
+    """One symbol's candles, shared by the row-wise (live) and DataFrame (backtest) strategy paths.
+
+    `candles[i]['close']` reads straight from the column arrays; `candles.frame` is the
+    DataFrame those arrays belong to, so neither path converts the data.
+    """
+
+    def __init__(self, df: pd.DataFrame):
+        self.frame = df.reset_index(drop=True)
+        self.columns: Dict[str, np.ndarray] = {
+            c: self.frame[c].to_numpy() for c in self.frame.columns if c != 'timestamp'
+        }
+        self._timestamps: Optional[List[pd.Timestamp]] = None
+
+    def __len__(self) -> int:
+        return len(self.frame)
+
+    def __getitem__(self, index: int) -> CandleRow:
+        if index < 0:
+            index += len(self)
+        if not 0 <= index < len(self):
+            raise IndexError(index)
+        return CandleRow(self, index)
+
+    @property
+    def timestamps(self) -> List[pd.Timestamp]:
+        """Per-bar Timestamps, materialised once for row-wise access"""
+        if self._timestamps is None:
+            self._timestamps = list(self.frame['timestamp'])
+        return self._timestamps
@@ -0,0 +1,290 @@
+import threading
+import time
+import logging
+import numpy as np
+import pandas as pd
+from datetime import date, datetime, timedelta
+from typing import Dict, List, Optional
+from config import Config
+from strategy import TradingStrategy
+from serialization import epoch_seconds
+
+logger = logging.getLogger(__name__)
+
+PRICE_FIELDS = ('o', 'h', 'l', 'c', 'v')
+SNAPSHOT_CACHE_SIZE = 4  # memoised snapshot sizes per sequence
+
+
+def rolling_mean(values: np.ndarray, window: int) -> np.ndarray:
+    """Trailing simple moving average, NaN until `window` values are available"""
+    out = np.full(len(values), np.nan)
+    if len(values) >= window:
+        csum = np.cumsum(np.insert(values, 0, 0.0))
+        out[window - 1:] = (csum[window:] - csum[:-window]) / window
+    return out
+
+
+def downsample_ohlc(series: Dict[str, np.ndarray], max_points: int) -> Dict[str, np.ndarray]:
+    """Min-max bucketing: merge consecutive bars into at most `max_points` OHLC bars"""
+    n = len(series['t'])
+    if n <= max_points:
+        return series
+    starts = np.linspace(0, n, max_points, endpoint=False).astype(np.int64)
+    ends = np.append(starts[1:], n) - 1
+    return {
+        't': series['t'][starts],
+        'o': series['o'][starts],
+        'h': np.maximum.reduceat(series['h'], starts),
+        'l': np.minimum.reduceat(series['l'], starts),
+        'c': series['c'][ends],
+        'v': np.add.reduceat(series['v'], starts),
+        'sma': series['sma'][ends],
+    }
+
+
+class ChartSeries:
+    """Append-only 3-minute candle arrays for one symbol, versioned by sequence number.
+
+    Arrays are replaced, never mutated, and `seq` moves with them under `_lock`, so readers
+    take a consistent (seq, arrays) pair and work on it outside the lock.
+    """
+
+    def __init__(self, symbol: str, sma_period: int = Config.SMA_PERIOD):
+        self.symbol = symbol
+        self.sma_period = sma_period
+        self.seq = 0
+        self.epoch = int(time.time())
+        self.arrays = {k: np.empty(0, dtype=np.int64 if k == 't' else np.float64)
+                       for k in ('t',) + PRICE_FIELDS + ('sma',)}
+        self.bar_seq = np.empty(0, dtype=np.int64)
+        self.markers: List[Dict] = []
+        self.last_refresh = 0.0
+        self.first_changed = 0
+        self.history_start: Optional[date] = None  # earliest date the series is known to cover
+        self._snapshots: Dict[int, Dict] = {}
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return len(self.arrays['t'])
+
+    def first_day(self) -> Optional[date]:
+        if not len(self):
+            return None
+        return pd.Timestamp(int(self.arrays['t'][0]), unit='s', tz='UTC').tz_convert('Asia/Kolkata').date()
+
+    def merge(self, df: pd.DataFrame) -> int:
+        """Merge fetched candles, stamping new/changed bars with a fresh sequence number"""
+        if df is None or df.empty:
+            return 0
+        incoming = {
+            't': epoch_seconds(df['timestamp']),
+            'o': df['open'].to_numpy(dtype=np.float64),
+            'h': df['high'].to_numpy(dtype=np.float64),
+            'l': df['low'].to_numpy(dtype=np.float64),
+            'c': df['close'].to_numpy(dtype=np.float64),
+            'v': df['volume'].to_numpy(dtype=np.float64),
+        }
+        t_old = self.arrays['t']
+        # Everything from the first incoming timestamp onward is replaced
+        cut = int(np.searchsorted(t_old, incoming['t'][0], side='left'))
+        merged = {k: np.concatenate([self.arrays[k][:cut], incoming[k]]) for k in ('t',) + PRICE_FIELDS}
+
+        overlap = max(0, min(len(t_old), len(merged['t'])) - cut)
+        changed = np.ones(len(merged['t']) - cut, dtype=bool)
+        if overlap:
+            same = np.ones(overlap, dtype=bool)
+            for k in ('t',) + PRICE_FIELDS:
+                same &= self.arrays[k][cut:cut + overlap] == merged[k][cut:cut + overlap]
+            changed[:overlap] = ~same
+        if not changed.any():
+            return 0
+
+        # SMA only needs recomputing from `cut`, seeded with the preceding window
+        sma = np.concatenate([self.arrays['sma'][:cut], np.empty(len(merged['t']) - cut)])
+        seed = max(0, cut - self.sma_period + 1)
+        sma[cut:] = rolling_mean(merged['c'][seed:], self.sma_period)[cut - seed:]
+        if overlap:
+            changed[:overlap] |= ~np.isclose(sma[cut:cut + overlap],
+                                             self.arrays['sma'][cut:cut + overlap], equal_nan=True)
+
+        seq = self.seq + 1
+        bar_seq = np.concatenate([self.bar_seq[:cut + overlap],
+                                  np.zeros(len(changed) - overlap, dtype=np.int64)])
+        bar_seq[cut:][changed] = seq
+        merged['sma'] = sma
+
+        with self._lock:
+            self.arrays, self.bar_seq, self.seq = merged, bar_seq, seq
+            self.first_changed = cut + int(np.argmax(changed))
+            self._snapshots.clear()
+        return int(changed.sum())
+
+    @classmethod
+    def from_arrays(cls, symbol: str, arrays: Dict[str, np.ndarray], markers: List[Dict]) -> 'ChartSeries':
+        """Rebuild a series from a warm-state snapshot (it refreshes on first request)"""
+        series = cls(symbol)
+        series.arrays = {k: np.asarray(arrays[k]) for k in series.arrays}
+        series.bar_seq = np.zeros(len(series.arrays['t']), dtype=np.int64)
+        series.markers = markers
+        series.history_start = series.first_day()
+        return series
+
+    def set_markers(self, markers: List[Dict]):
+        with self._lock:
+            self.markers = markers
+            self._snapshots.clear()
+
+    def snapshot(self, max_points: int) -> Dict:
+        """Downsampled full view (50 to CHART_MAX_POINTS bars), memoised per sequence so viewers share it"""
+        max_points = min(max(50, max_points), Config.CHART_MAX_POINTS)
+        with self._lock:
+            cached = self._snapshots.get(max_points)
+            if cached is not None:
+                return cached
+            arrays, seq, markers = self.arrays, self.seq, self.markers
+
+        n = len(arrays['t'])
+        view = downsample_ohlc(arrays, max_points)
+        payload = {
+            'symbol': self.symbol,
+            'epoch': self.epoch,
+            'seq': seq,
+            'bars': n,
+            'downsampled': len(view['t']) < n,
+            **{k: (v if k in ('t', 'v') else np.round(v, 2)) for k, v in view.items()},
+            'markers': markers,
+        }
+        with self._lock:
+            # Only cache if no merge landed meanwhile; keep the few most recent sizes
+            if self.seq == seq and self.markers is markers:
+                if len(self._snapshots) >= SNAPSHOT_CACHE_SIZE:
+                    self._snapshots.pop(next(iter(self._snapshots)))
+                self._snapshots[max_points] = payload
+        return payload
+
+    def delta(self, since: int) -> Dict:
+        """Raw bars whose sequence number is newer than `since`"""
+        with self._lock:
+            arrays, bar_seq, seq, markers = self.arrays, self.bar_seq, self.seq, self.markers
+        idx = np.flatnonzero(bar_seq > since)
+        return {
+            'symbol': self.symbol,
+            'epoch': self.epoch,
+            'seq': seq,
+            **{k: (v[idx] if k in ('t', 'v') else np.round(v[idx], 2)) for k, v in arrays.items()},
+            'markers': markers,
+        }
+
+
+class ChartFeed:
+    """Shared chart state for all viewers: one ChartSeries per symbol.
+
+    `_lock` only guards the symbol maps; fetches and merges hold that symbol's own lock, so
+    one slow symbol never blocks another and concurrent requests for it share one fetch.
+    """
+
+    def __init__(self, dhan_client, strategy: TradingStrategy,
+                 refresh_seconds: int = Config.CHART_REFRESH_SECONDS):
+        self.dhan_client = dhan_client
+        self.strategy = strategy
+        self.refresh_seconds = refresh_seconds
+        self._series: Dict[str, ChartSeries] = {}
+        self._symbol_locks: Dict[str, threading.Lock] = {}
+        self._lock = threading.Lock()
+
+    @property
+    def series(self) -> Dict[str, ChartSeries]:
+        with self._lock:
+            return dict(self._series)
+
+    def restore(self, snapshot: Dict[str, Dict]):
+        with self._lock:
+            for symbol, data in snapshot.items():
+                self._series[symbol] = ChartSeries.from_arrays(symbol, data, data['markers'])
+
+    def _symbol_lock(self, symbol: str) -> threading.Lock:
+        with self._lock:
+            return self._symbol_locks.setdefault(symbol, threading.Lock())
+
+    def _fetch(self, symbol: str, days: int) -> Optional[pd.DataFrame]:
+        security_id = self.dhan_client.get_security_id(symbol)
+        if not security_id:
+            return None
+        return self.dhan_client.get_historical_data(security_id, days)
+
+    def _find_markers(self, series: ChartSeries, from_index: int) -> List[Dict]:
+        """10 AM setups and their rejection candles, rescanning only sessions from `from_index`"""
+        a = series.arrays
+        # Sessions are split on UTC midnight (05:30 IST), which always falls between them
+        day = a['t'] // 86400
+        start = int(np.searchsorted(day, day[from_index], side='left'))
+        kept = [m for m in series.markers if m['t'] < a['t'][start]]
+
+        df = pd.DataFrame({
+            'timestamp': pd.to_datetime(a['t'][start:], unit='s', utc=True).tz_convert('Asia/Kolkata'),
+            'open': a['o'][start:], 'high': a['h'][start:], 'low': a['l'][start:],
+            'close': a['c'][start:], 'SMA_50': a['sma'][start:],
+        })
+        df['is_10am_candle'] = (df['timestamp'].dt.hour == 10) & (df['timestamp'].dt.minute == 0)
+
+        markers = []
+        for i in np.flatnonzero(df['is_10am_candle'].to_numpy()):
+            day_end = int(np.searchsorted(day[start:], day[start + i], side='right'))
+            day_start = int(np.searchsorted(day[start:], day[start + i], side='left'))
+            session = df.iloc[day_start:day_end].reset_index(drop=True)
+            setup = self.strategy.check_10am_signal(session, i - day_start)
+            if not setup:
+                continue
+            markers.append({'t': int(a['t'][start + i]), 'type': setup,
+                            'price': round(float(a['c'][start + i]), 2)})
+            rejection = self.strategy.find_rejection_candle(session, i - day_start, setup)
+            if rejection:
+                j = start + day_start + rejection['index']
+                markers.append({'t': int(a['t'][j]), 'type': rejection['rejection_type'],
+                                'price': round(float(a['c'][j]), 2)})
+        return kept + markers
+
+    def get_series(self, symbol: str, days: int = 5) -> Optional[ChartSeries]:
+        """Return the shared series, fetching/refreshing at most once per refresh interval"""
+        symbol = symbol.strip().upper()
+        with self._symbol_lock(symbol):
+            series = self._series.get(symbol)
+            now = time.monotonic()
+            # Same window as DhanClient.get_historical_data(days)
+            start = datetime.now().date() - timedelta(days=days)
+            backfill = series is not None and len(series) > 0 and (
+                series.history_start is None or start < series.history_start)
+            if series is not None and not backfill and now - series.last_refresh < self.refresh_seconds:
+                return series
+
+            # Full window for new series or a longer view than loaded so far, else just today
+            fetch_days = days if series is None or len(series) == 0 or backfill else 1
+            df = self._fetch(symbol, fetch_days)
+            series = self._merge(symbol, df, now)
+            if series is not None and df is not None and fetch_days == days:
+                series.history_start = min(start, series.history_start or start)
+            return series
+
+    def update(self, symbol: str, df: pd.DataFrame) -> Optional[ChartSeries]:
+        """Merge candles fetched elsewhere (e.g. the end-of-day pipeline) without another API call"""
+        symbol = symbol.strip().upper()
+        with self._symbol_lock(symbol):
+            return self._merge(symbol, df, time.monotonic())
+
+    def _merge(self, symbol: str, df: Optional[pd.DataFrame], now: float) -> Optional[ChartSeries]:
+        """Caller holds the symbol lock"""
+        series = self._series.get(symbol)
+        if series is None:
+            if df is None or df.empty:
+                return None
+            series = ChartSeries(symbol)
+            with self._lock:
+                self._series[symbol] = series
+
+        if series.merge(df):
+            if series.history_start is None or series.first_day() < series.history_start:
+                series.history_start = series.first_day()
+            series.set_markers(self._find_markers(series, series.first_changed))
+            logger.info(f"Chart {symbol}: {len(series)} bars, seq={series.seq}")
+        series.last_refresh = now
+        return series
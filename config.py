@@ -1,5 +1,5 @@
 import os
-from datetime import time
+from datetime import date, time
 
 class Config:
     DHAN_CLIENT_ID = os.getenv("DHAN_CLIENT_ID", "1100987697")
@@ -20,7 +20,7 @@ class Config:
     # }
      # Trading Parameters
     WATCHLIST_STOCKS = [
-        "RELIANCE", "TCS", "INFY", "HDFC", "ITC", 
+        "RELIANCE", "TCS", "INFY", "HDFCBANK", "ITC", 
         "ICICIBANK", "BHARTIARTL", "SBIN", "LT", "HCLTECH"
     ]
     
@@ -32,4 +32,89 @@ class Config:
     TRADE_START_TIME = time(9, 15)   # 9:15 AM
     TRADE_END_TIME = time(15, 30)    # 3:30 PM
     NO_ENTRY_AFTER = time(13, 0)     # 1:00 PM
-    EXIT_ALL_TIME = time(15, 0)      # 3:00 PM
\ No newline at end of file
+    EXIT_ALL_TIME = time(15, 0)      # 3:00 PM
+
+    # Trade ledger (full trade history, SQLite)
+    TRADE_LEDGER_PATH = os.getenv("TRADE_LEDGER_PATH", "trades.db")
+    TRADE_LEDGER_MAX_PAGE_SIZE = 1000
+
+    # Live chart feed
+    CHART_REFRESH_SECONDS = 60
+    CHART_MAX_POINTS = 800
+
+    # Startup warm state (resolved IDs, chart candles + SMA)
+    WARM_STATE_ENABLED = os.getenv("WARM_STATE_ENABLED", "1") == "1"
+    WARM_STATE_PATH = os.getenv("WARM_STATE_PATH", "warm_state.npz")
+    WARM_STATE_MAX_AGE_HOURS = 72
+
+    # Candle store + universe screener
+    CANDLE_STORE_DIR = os.getenv("CANDLE_STORE_DIR", "candle_store")
+    CANDLE_STORE_READ_WORKERS = 8
+    SCREENER_OUTPUT_PATH = os.getenv("SCREENER_OUTPUT_PATH", "screener_watchlist.json")
+    SCREENER_TOP_N = 10
+    SCREENER_SLOPE_BARS = 10
+    SCREENER_MIN_TURNOVER = 2_000_000  # median ₹ traded per 3-min bar
+
+    # Transaction costs (NSE cash intraday)
+    TRADE_QUANTITY = 100
+    BROKERAGE_RATE = 0.0003          # 0.03% per executed order ...
+    BROKERAGE_CAP = 20.0             # ... capped at ₹20
+    STT_INTRADAY_SELL_RATE = 0.00025
+    EXCHANGE_TXN_RATE = 0.0000297    # NSE transaction charge
+    SEBI_FEE_RATE = 0.000001         # ₹10 per crore
+    GST_RATE = 0.18                  # on brokerage + exchange + SEBI fees
+    STAMP_DUTY_BUY_RATE = 0.00003
+    SLIPPAGE_MIN_BPS = 1.0
+    SLIPPAGE_RANGE_FRACTION = 0.1    # share of bar range paid at full participation
+
+    # 1-minute candle validation (see data_quality.py)
+    GAP_FILL_POLICY = os.getenv("GAP_FILL_POLICY", "ffill")  # none | ffill | drop_session
+    MAX_SESSION_GAP_RATIO = 0.2      # drop_session: share of missing minutes that voids a session
+    NSE_HOLIDAYS = [
+        date(2025, 2, 26), date(2025, 3, 14), date(2025, 3, 31), date(2025, 4, 10),
+        date(2025, 4, 14), date(2025, 4, 18), date(2025, 5, 1), date(2025, 8, 15),
+        date(2025, 8, 27), date(2025, 10, 2), date(2025, 10, 21), date(2025, 10, 22),
+        date(2025, 11, 5), date(2025, 12, 25),
+        date(2026, 1, 15), date(2026, 1, 26), date(2026, 3, 3), date(2026, 3, 26),
+        date(2026, 3, 31), date(2026, 4, 3), date(2026, 4, 14), date(2026, 5, 1),
+        date(2026, 5, 28), date(2026, 6, 26), date(2026, 9, 14), date(2026, 10, 2),
+        date(2026, 10, 20), date(2026, 11, 10), date(2026, 11, 24), date(2026, 12, 25),
+    ]
+    NSE_CALENDAR_YEARS = {d.year for d in NSE_HOLIDAYS}  # years the holiday list is known to cover
+    # Shortened sessions on otherwise closed days, e.g. Diwali Muhurat trading
+    NSE_SPECIAL_SESSIONS = {
+        date(2025, 10, 21): (time(13, 45), time(14, 45)),
+    }
+
+    # Dhan API record / replay (offline runs and load tests)
+    DHAN_API_MODE = os.getenv("DHAN_API_MODE", "live")  # live | record | replay
+    API_FIXTURE_DIR = os.getenv("API_FIXTURE_DIR", "api_fixtures")
+    REPLAY_LATENCY_MS = float(os.getenv("REPLAY_LATENCY_MS", "0"))
+    REPLAY_JITTER_MS = float(os.getenv("REPLAY_JITTER_MS", "0"))
+    REPLAY_ERROR_RATE = float(os.getenv("REPLAY_ERROR_RATE", "0"))
+    REPLAY_SEED = int(os.getenv("REPLAY_SEED", "7"))
+    REPLAY_SYNTHETIC = os.getenv("REPLAY_SYNTHETIC", "1") == "1"  # random-walk data when no fixture
+    # Synthetic data is a fixed calendar ending here, whatever today is ("" follows the requested dates)
+    REPLAY_ANCHOR_DATE = os.getenv("REPLAY_ANCHOR_DATE", "2025-10-17")
+    REPLAY_HISTORY_DAYS = 400
+    LOAD_RESULTS_DIR = os.getenv("LOAD_RESULTS_DIR", "load_results")
+    LOAD_REGRESSION_TOLERANCE = 0.25  # allowed p95 latency growth / throughput drop vs baseline
+
+    # Instrument index (full Dhan scrip master)
+    SCRIP_MASTER_URL = "https://images.dhan.co/api-data/api-scrip-master.csv"
+    INSTRUMENT_MASTER_PATH = os.getenv("INSTRUMENT_MASTER_PATH", "instrument_master.csv")
+    INSTRUMENT_MASTER_MAX_AGE_HOURS = 24  # Dhan republishes the scrip master daily
+    DEFAULT_TICK_SIZE = 0.05
+
+    # End-of-day pipeline (eod_pipeline.py)
+    EOD_SCHEDULER_ENABLED = os.getenv("EOD_SCHEDULER_ENABLED", "0") == "1"
+    EOD_RUN_TIME = time(16, 0)       # IST, after the closing session settles
+    EOD_FETCH_DAYS = 1
+    EOD_FETCH_WORKERS = 4
+    EOD_BACKFILL_SYMBOLS = 200       # universe symbols not yet in the candle store, added per run
+    EOD_BACKFILL_DAYS = 5
+    EOD_TIMEFRAMES = ('15min', '1D')
+    EOD_REPORT_PATH = os.getenv("EOD_REPORT_PATH", "eod_report.json")
+
+    # Performance report
+    EQUITY_CURVE_POINTS = 500        # max points returned for equity / daily series
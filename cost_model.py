@@ -0,0 +1,79 @@
+import numpy as np
+from abc import ABC, abstractmethod
+from typing import Dict
+from config import Config
+
+
+class CostModel(ABC):
+    """Transaction costs applied to a whole trade set at once.
+
+    `apply` receives equal-length arrays and returns per-trade 'slippage', 'charges',
+    'net_pnl' arrays (₹, for the full quantity).
+    """
+
+    @abstractmethod
+    def apply(self, *, side: np.ndarray, quantity: np.ndarray, entry_price: np.ndarray,
+              exit_price: np.ndarray, gross_pnl: np.ndarray, entry_range: np.ndarray,
+              exit_range: np.ndarray, entry_volume: np.ndarray, exit_volume: np.ndarray,
+              exit_is_limit: np.ndarray) -> Dict[str, np.ndarray]:
+        ...
+
+
+class ZeroCostModel(CostModel):
+    """Frictionless fills (the original backtest behaviour)"""
+
+    def apply(self, *, gross_pnl: np.ndarray, **_) -> Dict[str, np.ndarray]:
+        zeros = np.zeros(len(gross_pnl))
+        return {'slippage': zeros, 'charges': zeros, 'net_pnl': np.asarray(gross_pnl, dtype=np.float64)}
+
+
+class IndianIntradayCostModel(CostModel):
+    """NSE cash intraday: brokerage, STT, exchange + SEBI fees, GST, stamp duty and slippage"""
+
+    def __init__(self, config: Config = Config):
+        self.brokerage_rate = config.BROKERAGE_RATE
+        self.brokerage_cap = config.BROKERAGE_CAP
+        self.stt_sell_rate = config.STT_INTRADAY_SELL_RATE
+        self.exchange_rate = config.EXCHANGE_TXN_RATE
+        self.sebi_rate = config.SEBI_FEE_RATE
+        self.gst_rate = config.GST_RATE
+        self.stamp_buy_rate = config.STAMP_DUTY_BUY_RATE
+        self.slippage_min_bps = config.SLIPPAGE_MIN_BPS
+        self.slippage_range_fraction = config.SLIPPAGE_RANGE_FRACTION
+
+    def _slippage_per_share(self, price, candle_range, volume, quantity):
+        # Floor in bps plus a share of the bar's range that grows with participation
+        participation = np.minimum(1.0, quantity / np.maximum(volume, 1.0))
+        return (price * self.slippage_min_bps / 1e4
+                + self.slippage_range_fraction * candle_range * np.sqrt(participation))
+
+    def apply(self, *, side, quantity, entry_price, exit_price, gross_pnl, entry_range,
+              exit_range, entry_volume, exit_volume, exit_is_limit) -> Dict[str, np.ndarray]:
+        quantity = quantity.astype(np.float64)
+        entry_slip = self._slippage_per_share(entry_price, entry_range, entry_volume, quantity)
+        # Target exits are resting limit orders; stop and EOD exits cross the spread
+        exit_slip = np.where(exit_is_limit, 0.0,
+                             self._slippage_per_share(exit_price, exit_range, exit_volume, quantity))
+        slippage = (entry_slip + exit_slip) * quantity
+
+        # Fill prices after slippage (always adverse to the position)
+        entry_fill = entry_price + side * entry_slip
+        exit_fill = exit_price - side * exit_slip
+        buy_value = np.where(side > 0, entry_fill, exit_fill) * quantity
+        sell_value = np.where(side > 0, exit_fill, entry_fill) * quantity
+        turnover = buy_value + sell_value
+
+        brokerage = (np.minimum(buy_value * self.brokerage_rate, self.brokerage_cap)
+                     + np.minimum(sell_value * self.brokerage_rate, self.brokerage_cap))
+        exchange = turnover * self.exchange_rate
+        sebi = turnover * self.sebi_rate
+        charges = (brokerage + exchange + sebi
+                   + self.gst_rate * (brokerage + exchange + sebi)
+                   + sell_value * self.stt_sell_rate
+                   + buy_value * self.stamp_buy_rate)
+
+        return {
+            'slippage': slippage,
+            'charges': charges,
+            'net_pnl': gross_pnl - slippage - charges,
+        }
@@ -0,0 +1,150 @@
+import logging
+import numpy as np
+import pandas as pd
+from datetime import date, time
+from typing import Dict, Iterable, Tuple
+from config import Config
+
+logger = logging.getLogger(__name__)
+
+IST_OFFSET = 5 * 3600 + 30 * 60
+GAP_POLICIES = ('none', 'ffill', 'drop_session')
+MAX_FLAGGED_BARS = 20  # repaired bar timestamps listed in the report
+
+
+_uncovered_years_warned = set()
+
+
+def check_calendar(years: Iterable[int]) -> bool:
+    """False (with a one-time warning per year) if Config.NSE_HOLIDAYS does not cover `years`"""
+    missing = set(years) - Config.NSE_CALENDAR_YEARS
+    for year in sorted(missing - _uncovered_years_warned):
+        logger.warning(f"NSE holiday calendar has no {year} dates; holidays in {year} are treated as "
+                       f"trading days (add them to Config.NSE_HOLIDAYS)")
+    _uncovered_years_warned.update(missing)
+    return not missing
+
+
+def _minute_of_day(t: time) -> int:
+    return t.hour * 60 + t.minute
+
+
+def validate_candles(df: pd.DataFrame, policy: str = None) -> Tuple[pd.DataFrame, Dict]:
+    """Validate and repair 1-minute candles before resampling.
+
+    Drops bad/duplicate/out-of-session bars, repairs inconsistent OHLC, and handles
+    intra-session gaps per `policy` ('none', 'ffill' flat zero-volume bars, or
+    'drop_session' above Config.MAX_SESSION_GAP_RATIO). Returns (clean_df, report).
+    """
+    policy = policy or Config.GAP_FILL_POLICY
+    if policy not in GAP_POLICIES:
+        raise ValueError(f"Unknown gap policy '{policy}', expected one of {GAP_POLICIES}")
+
+    report = {'input_bars': len(df), 'policy': policy}
+    if df.empty:
+        return df, {**report, 'output_bars': 0}
+
+    ts = pd.to_datetime(df['timestamp'], errors='coerce', utc=True)
+    epoch = ts.to_numpy(dtype='datetime64[s]').astype(np.int64)
+    o, h, l, c = (df[k].to_numpy(dtype=np.float64) for k in ('open', 'high', 'low', 'close'))
+    v = df['volume'].to_numpy(dtype=np.float64)
+
+    # --- timestamps: invalid / pre-2000, then duplicates (keep the last bar received)
+    valid_ts = ts.notna().to_numpy() & (epoch >= 946684800)
+    order = np.argsort(np.where(valid_ts, epoch, np.iinfo(np.int64).max), kind='stable')
+    epoch_sorted = epoch[order]
+    last_of_run = np.append(epoch_sorted[1:] != epoch_sorted[:-1], True)
+    keep = np.zeros(len(df), dtype=bool)
+    keep[order[last_of_run]] = True
+    report['bad_timestamps'] = int((~valid_ts).sum())
+    report['duplicates'] = int((valid_ts & ~keep).sum())
+    keep &= valid_ts
+
+    # --- session calendar: weekends, NSE holidays, regular or special session hours
+    local = epoch + IST_OFFSET
+    day = local // 86400
+    minute = (local % 86400) // 60
+    weekday = (day + 3) % 7  # 1970-01-01 was a Thursday -> Monday == 0
+    years = np.unique(day[keep].astype('datetime64[D]').astype('datetime64[Y]').astype(np.int64) + 1970)
+    check_calendar(years.tolist())
+    holidays = np.array([(d - date(1970, 1, 1)).days for d in Config.NSE_HOLIDAYS], dtype=np.int64)
+    open_min = np.full(len(df), _minute_of_day(Config.TRADE_START_TIME))
+    close_min = np.full(len(df), _minute_of_day(Config.TRADE_END_TIME))
+    special = np.zeros(len(df), dtype=bool)
+    for d, (start, end) in Config.NSE_SPECIAL_SESSIONS.items():
+        on_day = day == (d - date(1970, 1, 1)).days
+        open_min[on_day], close_min[on_day] = _minute_of_day(start), _minute_of_day(end)
+        special |= on_day
+    in_session = ((weekday < 5) | special) & (~np.isin(day, holidays) | special) \
+        & (minute >= open_min) & (minute < close_min)
+    report['out_of_session'] = int((keep & ~in_session).sum())
+    keep &= in_session
+
+    # --- OHLC sanity: unusable prices are dropped, inconsistent ranges repaired
+    prices = np.column_stack([o, h, l, c])
+    unusable = ~np.isfinite(prices).all(axis=1) | (prices <= 0).any(axis=1) | ~np.isfinite(v) | (v < 0)
+    report['unusable_prices'] = int((keep & unusable).sum())
+    keep &= ~unusable
+    # High below low is a swapped pair: swap it back, then widen only as far as open/close need
+    swapped = keep & (h < l)
+    h, l = np.where(swapped, l, h), np.where(swapped, h, l)
+    body_high, body_low = np.maximum(o, c), np.minimum(o, c)
+    widened = keep & ((h < body_high) | (l > body_low))
+    h, l = np.maximum(h, body_high), np.minimum(l, body_low)
+    repaired = swapped | widened
+    report['swapped_high_low'] = int(swapped.sum())
+    report['repaired_ohlc'] = int(repaired.sum())
+    report['repaired_bars'] = [str(t) for t in ts[repaired][:MAX_FLAGGED_BARS].tolist()]
+
+    idx = np.flatnonzero(keep)
+    idx = idx[np.argsort(epoch[idx], kind='stable')]
+    epoch, day, o, h, l, c, v = epoch[idx], day[idx], o[idx], h[idx], l[idx], c[idx], v[idx]
+    session_open, session_length = open_min[idx], (close_min - open_min)[idx]
+    report['zero_volume_bars'] = int((v == 0).sum())
+
+    # --- gaps inside each session (consecutive bars more than a minute apart)
+    step = np.diff(epoch) // 60
+    same_day = day[1:] == day[:-1]
+    missing = np.where(same_day, step - 1, 0)
+    sessions, first = np.unique(day, return_index=True)
+    session_missing = np.add.reduceat(np.append(missing, 0), first) if len(first) else np.array([])
+    session_bars = np.diff(np.append(first, len(day)))
+    # Expected minutes per session; the last one only counts up to its last bar, since the
+    # rest of it may not have happened yet (or was not fetched)
+    session_expected = session_length[first].copy()
+    if len(first):
+        last_minute = (epoch[-1] + IST_OFFSET) % 86400 // 60
+        session_expected[-1] = min(session_expected[-1], last_minute - session_open[first[-1]] + 1)
+    session_absent = session_expected - session_bars  # includes late open / early stop
+    report['sessions'] = int(len(sessions))
+    report['missing_minutes'] = int(missing.sum())
+    report['incomplete_sessions'] = int((session_absent > 0).sum())
+    report['sessions_with_gaps'] = int((session_missing > 0).sum())
+
+    if policy == 'drop_session' and len(sessions):
+        gap_ratio = session_absent / session_expected
+        bad_days = sessions[gap_ratio > Config.MAX_SESSION_GAP_RATIO]
+        keep_rows = ~np.isin(day, bad_days)
+        report['dropped_sessions'] = [str(date.fromordinal(date(1970, 1, 1).toordinal() + int(d))) for d in bad_days]
+        epoch, o, h, l, c, v = (a[keep_rows] for a in (epoch, o, h, l, c, v))
+    elif policy == 'ffill' and missing.sum():
+        # Repeat the previous bar's close as a flat, zero-volume bar for every missing minute
+        repeats = np.append(missing, 0) + 1
+        src = np.repeat(np.arange(len(epoch)), repeats)
+        offset = np.arange(len(src)) - np.repeat(np.cumsum(repeats) - repeats, repeats)
+        filled = offset > 0
+        epoch = epoch[src] + offset * 60
+        o, h, l, c = (np.where(filled, c[src], a[src]) for a in (o, h, l, c))
+        v = np.where(filled, 0.0, v[src])
+        report['filled_bars'] = int(filled.sum())
+
+    clean = pd.DataFrame({
+        'timestamp': pd.to_datetime(epoch, unit='s', utc=True),
+        'open': o, 'high': h, 'low': l, 'close': c, 'volume': v,
+    })
+    report['output_bars'] = len(clean)
+    dropped = report['input_bars'] - len(clean) + report.get('filled_bars', 0)
+    if dropped or report['repaired_ohlc'] or report['missing_minutes']:
+        logger.warning(f"Candle quality: dropped {dropped} bars, repaired {report['repaired_ohlc']}, "
+                       f"{report['missing_minutes']} missing minutes across {report['sessions_with_gaps']} sessions")
+    return clean, report
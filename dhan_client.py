@@ -1,9 +1,13 @@
 import os
+import time
 import pandas as pd
 from datetime import datetime, timedelta
 from typing import Optional
 import logging
 from config import Config
+from data_quality import validate_candles
+from api_fixtures import build_client
+from instruments import InstrumentIndex, download_scrip_master, from_legacy_master
 from dhanhq import dhanhq
 
 logger = logging.getLogger(__name__)
@@ -11,9 +15,23 @@ logger = logging.getLogger(__name__)
 class DhanClient:
     def __init__(self):
         self.config = Config()
-        self.client = dhanhq(self.config.DHAN_CLIENT_ID, self.config.DHAN_ACCESS_TOKEN)
+        self.client = build_client(lambda: dhanhq(self.config.DHAN_CLIENT_ID, self.config.DHAN_ACCESS_TOKEN))
         self.security_master_file = "security_master.csv"
-        self.security_master_df = self._load_security_master()
+        self.instrument_master_file = Config.INSTRUMENT_MASTER_PATH
+        self._instruments = None
+        self.security_id_cache = {}
+        self.quality_reports = {}
+
+    @property
+    def instruments(self) -> InstrumentIndex:
+        """Instrument index, loaded on first use"""
+        if self._instruments is None:
+            self._instruments = self._load_instruments()
+        return self._instruments
+
+    @property
+    def security_master_df(self) -> pd.DataFrame:
+        return self.instruments.frame
 
     # =======================================================
     # Security Master Loader
@@ -58,84 +76,59 @@ class DhanClient:
         dm= df_3min.reset_index()
         return dm._resample_to_3min(df_1min)
 
-    def _load_security_master(self) -> pd.DataFrame:
-        """Load or fetch Dhan Security Master for NSE Equity"""
-        if not os.path.exists(self.security_master_file):
-            logger.info("Downloading Security Master...")
-            url = "https://images.dhan.co/api-data/api-scrip-master.csv"
-            df = pd.read_csv(url, low_memory=False)
-
-            # Normalize column names
-            df.columns = df.columns.str.strip().str.lower()
-            logger.info(f"CSV Columns Detected: {df.columns.tolist()}")
-
-            # Detect exchange column dynamically
-            exch_col = next((c for c in df.columns if 'exm' in c or 'exchange' in c), None)
-            if exch_col:
-                df[exch_col] = df[exch_col].astype(str).str.upper()
-                df = df[df[exch_col].str.contains("NSE")]
-
-            # Detect symbol & security_id columns
-            symbol_col = next((c for c in df.columns if 'symbol' in c), None)
-            secid_col = next((c for c in df.columns if 'security' in c and 'id' in c), None)
-
-            if not symbol_col or not secid_col:
-                logger.error("❌ Could not detect symbol/security_id columns!")
-                return pd.DataFrame()
-
-            df = df[[secid_col, symbol_col]].rename(columns={
-                secid_col: 'security_id',
-                symbol_col: 'symbol'
-            })
-
-            # Clean up symbols
-            df['symbol'] = df['symbol'].astype(str).str.strip().str.upper()
-            df.drop_duplicates(subset='symbol', inplace=True)
-
-            df.to_csv(self.security_master_file, index=False)
-            logger.info(f"✅ Saved {len(df)} NSE security IDs to {self.security_master_file}")
-            return df
-        else:
-            logger.info("Loading existing Security Master...")
-            return pd.read_csv(self.security_master_file)
+    def _load_instruments(self) -> InstrumentIndex:
+        """Instrument master if fresh, else a new download; the legacy cache is a last resort"""
+        path = self.instrument_master_file
+        fresh = os.path.exists(path) and \
+            time.time() - os.path.getmtime(path) < Config.INSTRUMENT_MASTER_MAX_AGE_HOURS * 3600 and \
+            InstrumentIndex.is_current(path)  # masters saved before a column was added are stale
+        if fresh:
+            logger.info("Loading existing instrument master...")
+            return InstrumentIndex.load(path)
+
+        if Config.DHAN_API_MODE != "replay":  # replay runs stay offline
+            try:
+                return download_scrip_master(path)
+            except Exception as e:
+                logger.warning(f"Scrip master download failed: {e}")
+
+        if os.path.exists(path):
+            logger.warning(f"Using stale instrument master {path}")
+            return InstrumentIndex.load(path)
+
+        # Older installs only cached (security_id, symbol); parse what the symbols carry
+        logger.warning("Falling back to legacy Security Master: expiries are month-level and lot sizes "
+                       "unknown, so weekly expiries cannot be resolved (run `python instruments.py`)")
+        return InstrumentIndex(from_legacy_master(pd.read_csv(self.security_master_file)))
+
+    def refresh_instruments(self) -> InstrumentIndex:
+        """Re-download the scrip master and drop cached lookups"""
+        self._instruments = download_scrip_master(self.instrument_master_file)
+        self.security_id_cache.clear()
+        return self._instruments
 
     # =======================================================
     # Security ID Lookup
     # =======================================================
     def get_security_id(self, symbol: str) -> Optional[str]:
-        """Fetch equity security ID for a given symbol (e.g., HDFC)"""
+        """Fetch equity security ID for a given symbol (e.g., HDFCBANK)"""
         symbol = symbol.strip().upper()
-        
-        if self.security_master_df is None or self.security_master_df.empty:
+        if symbol in self.security_id_cache:
+            return self.security_id_cache[symbol]
+
+        if not len(self.instruments):
             logger.warning("Security master is empty.")
-            print("DEBUG: Security master is empty or not loaded.")
             return None
 
-        # Filter for equity only: exclude derivatives
-        equity_df = self.security_master_df[
-            self.security_master_df['symbol'].str.startswith(symbol) &
-            (~self.security_master_df['symbol'].str.contains(
-                r'FUT|CE|PE|CALL|PUT|OPT|AUG|JAN|FEB|MAR|APR|MAY|JUN|JUL|SEP|OCT|NOV|DEC',
-                case=False, na=False))
-        ]
-        print(f"DEBUG: Filtered equity_df for symbol '{symbol}': {equity_df.shape[0]} rows")
-
-        # Exact match if exists
-        row = equity_df[equity_df['symbol'] == symbol]
-        if not row.empty:
-            print(f"DEBUG: Exact match found for symbol '{symbol}'")
-            return str(row.iloc[0]['security_id'])
-
-        # Fallback: first close match
-        if not equity_df.empty:
-            logger.warning(f"Using fallback match for symbol: {symbol}")
-            print(f"DEBUG: Fallback match used for symbol '{symbol}'")
-            print(equity_df.iloc[0]['security_id'])
-            return str(equity_df.iloc[0]['security_id'])
-
-        logger.warning(f"Security ID not found for {symbol}")
-        print(f"DEBUG: No match found for symbol '{symbol}'")
-        return None
+        security_id = self.instruments.security_id_for(symbol)
+        if security_id is None:
+            logger.warning(f"Security ID not found for {symbol}")
+            return None
+        self.security_id_cache[symbol] = security_id
+        return security_id
+
+    def tick_size(self, symbol: str) -> float:
+        return self.instruments.tick_size_for(symbol)
 
     # =======================================================
     # Historical Data Fetch
@@ -201,6 +194,9 @@ class DhanClient:
                 df = df[['timestamp', 'open', 'high', 'low', 'close', 'volume']]
                 print(17)
                 print(df)
+                # Validate / repair 1-minute bars before they are aggregated
+                df, report = validate_candles(df)
+                self.quality_reports[str(security_id)] = report
                 # Convert 1-minute data to 3-minute candles
                 return self._resample_to_3min(df)
 
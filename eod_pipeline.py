@@ -0,0 +1,262 @@
+import os
+import json
+import time
+import logging
+import argparse
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from datetime import date, datetime, timedelta
+from typing import TYPE_CHECKING, Dict, List, Optional
+from config import Config
+
+if TYPE_CHECKING:  # pandas is imported lazily to keep API startup light
+    import pandas as pd
+
+logger = logging.getLogger(__name__)
+
+IST = 'Asia/Kolkata'
+RESAMPLE_AGG = {'open': 'first', 'high': 'max', 'low': 'min', 'close': 'last', 'volume': 'sum'}
+
+
+def is_trading_day(day: date) -> bool:
+    from data_quality import check_calendar
+    check_calendar([day.year])
+    return (day.weekday() < 5 and day not in Config.NSE_HOLIDAYS) or day in Config.NSE_SPECIAL_SESSIONS
+
+
+def next_trading_day(day: date) -> date:
+    day += timedelta(days=1)
+    while not is_trading_day(day):
+        day += timedelta(days=1)
+    return day
+
+
+def last_report(path: Optional[str] = None) -> Optional[Dict]:
+    path = path or Config.EOD_REPORT_PATH
+    if not os.path.exists(path):
+        return None
+    with open(path) as f:
+        return json.load(f)
+
+
+class EndOfDayPipeline:
+    """After-close batch: fetch → candle store → higher timeframes → chart/warm state →
+    new-day backtests → screener, so the next morning starts warm. The backtests land in the
+    ledger, whose summary tables back the dashboard's performance view after a restart.
+
+    `services` is an AppServices instance (built on demand).
+    """
+
+    def __init__(self, services):
+        self.services = services
+        self._run_lock = threading.Lock()
+        self._timeframe_stores = {}
+
+    def tracked_symbols(self, svc) -> List[str]:
+        from screener import current_watchlist
+        return sorted(set(current_watchlist()) | set(svc.candle_store.symbols()))
+
+    def backfill_symbols(self, svc, tracked: List[str]) -> List[str]:
+        """Next batch of equity-universe symbols with no cached candles yet, so the
+        screener's universe grows to the full NSE cash list over a few runs"""
+        from screener import equity_universe
+        known = set(tracked)
+        missing = [s for s in equity_universe(svc.dhan_client.security_master_df) if s not in known]
+        return missing[:Config.EOD_BACKFILL_SYMBOLS]
+
+    # =======================================================
+    # Stages
+    # =======================================================
+    def _fetch_one(self, svc, symbol: str, days: int) -> Optional['pd.DataFrame']:
+        try:
+            security_id = svc.dhan_client.get_security_id(symbol)
+            if not security_id:
+                return None
+            return svc.dhan_client.get_historical_data(security_id, days)
+        except Exception as e:
+            logger.warning(f"EOD fetch failed for {symbol}: {e}")
+            return None
+
+    def _fetch(self, svc, symbols: List[str], days: int = Config.EOD_FETCH_DAYS) -> Dict[str, 'pd.DataFrame']:
+        with ThreadPoolExecutor(max_workers=Config.EOD_FETCH_WORKERS) as pool:
+            frames = dict(zip(symbols, pool.map(lambda s: self._fetch_one(svc, s, days), symbols)))
+        return {s: df for s, df in frames.items() if df is not None and not df.empty}
+
+    @staticmethod
+    def _day_slice(df: 'pd.DataFrame', trade_date: date) -> 'pd.DataFrame':
+        return df[df['timestamp'].dt.tz_convert(IST).dt.date == trade_date]
+
+    def _update_timeframes(self, svc, symbol: str, day_bars: 'pd.DataFrame'):
+        """Append the day's bars, resampled, to one CandleStore per higher timeframe"""
+        import pandas as pd
+        from candle_store import CandleStore
+
+        # Buckets anchored at the session open, so 09:15 starts every timeframe
+        session_open = day_bars['timestamp'].iloc[0].normalize() + pd.Timedelta(hours=9, minutes=15)
+        indexed = day_bars.set_index('timestamp')
+        for timeframe in Config.EOD_TIMEFRAMES:
+            if timeframe not in self._timeframe_stores:
+                self._timeframe_stores[timeframe] = CandleStore(os.path.join(svc.candle_store.path, timeframe))
+            bars = indexed.resample(timeframe, origin=session_open).agg(RESAMPLE_AGG).dropna()
+            self._timeframe_stores[timeframe].append(symbol, bars.reset_index())
+
+    def _backtest_day(self, svc, engine, symbol: str, trade_date: date) -> Optional[Dict]:
+        """Backtest only `trade_date`, with just enough history to warm up SMA_50"""
+        if svc.trade_ledger.query(page_size=1, symbol=symbol, start_date=trade_date,
+                                  end_date=trade_date, source='eod')['total']:
+            return None  # already recorded by an earlier run for this day
+
+        df = svc.candle_store.to_frame(symbol)
+        if df is None:
+            return None
+        day_start = int((df['timestamp'].dt.date < trade_date).sum())
+        if day_start == len(df):
+            return None
+        df = df.iloc[max(0, day_start - Config.SMA_PERIOD):]
+        return engine.run_backtest(df, symbol, since=trade_date, source='eod')
+
+    # =======================================================
+    # Run
+    # =======================================================
+    def run(self, trade_date: Optional[date] = None, symbols: Optional[List[str]] = None) -> Dict:
+        import pandas as pd
+        from backtest import BacktestEngine
+
+        with self._run_lock:
+            trade_date = trade_date or pd.Timestamp.now(tz=IST).date()
+            svc = self.services.get()
+            explicit = bool(symbols)
+            symbols = [s.strip().upper() for s in symbols] if explicit else self.tracked_symbols(svc)
+            timings = {}
+            report = {'trade_date': trade_date.isoformat(), 'symbols': len(symbols)}
+
+            started = time.perf_counter()
+            frames = self._fetch(svc, symbols)
+            timings['fetch'] = time.perf_counter() - started
+            report['fetched'] = len(frames)
+            report['failed'] = sorted(set(symbols) - set(frames))
+
+            started = time.perf_counter()
+            new_bars = 0
+            for symbol, df in frames.items():
+                svc.candle_store.append(symbol, df)
+                day_bars = self._day_slice(df, trade_date)
+                new_bars += len(day_bars)
+                if not day_bars.empty:
+                    self._update_timeframes(svc, symbol, day_bars)
+            report['new_bars'] = new_bars
+            timings['store'] = time.perf_counter() - started
+
+            # Grow the screener universe: a few days of history for uncached equities
+            started = time.perf_counter()
+            backfill = {} if explicit else self._fetch(svc, self.backfill_symbols(svc, symbols),
+                                                       Config.EOD_BACKFILL_DAYS)
+            for symbol, df in backfill.items():
+                svc.candle_store.append(symbol, df)
+            report['backfilled'] = len(backfill)
+            timings['backfill'] = time.perf_counter() - started
+
+            # Watchlist charts (candles + SMA + markers) go into the warm-state snapshot
+            started = time.perf_counter()
+            from screener import current_watchlist
+            for symbol in current_watchlist():
+                if symbol in frames:
+                    svc.chart_feed.update(symbol, frames[symbol])
+            timings['charts'] = time.perf_counter() - started
+
+            started = time.perf_counter()
+            engine = BacktestEngine(svc.strategy, ledger=svc.trade_ledger, dhan_client=svc.dhan_client)
+            trades = 0
+            for symbol in frames:
+                result = self._backtest_day(svc, engine, symbol, trade_date)
+                if result:
+                    trades += result.get('total_trades', 0)
+            report['new_trades'] = trades
+            timings['backtest'] = time.perf_counter() - started
+
+            started = time.perf_counter()
+            day = svc.trade_ledger.aggregate(by='day', start_date=trade_date, end_date=trade_date)
+            report['ledger_day'] = day[0] if day else None
+            timings['ledger'] = time.perf_counter() - started
+
+            started = time.perf_counter()
+            screen = svc.screener.screen()
+            # Stamped for the next session so tomorrow's current_watchlist() picks it up
+            svc.screener.save(screen, valid_for=next_trading_day(trade_date))
+            report['watchlist'] = screen['watchlist']
+            timings['screener'] = time.perf_counter() - started
+
+            svc.save_warm_state()
+            report['timings_seconds'] = {k: round(v, 3) for k, v in timings.items()}
+            report['completed_at'] = datetime.now().isoformat(timespec='seconds')
+
+            tmp = Config.EOD_REPORT_PATH + ".tmp"
+            with open(tmp, 'w') as f:
+                json.dump(report, f, indent=2, default=str)
+            os.replace(tmp, Config.EOD_REPORT_PATH)
+            logger.info(f"EOD {trade_date}: {report['fetched']}/{len(symbols)} symbols, "
+                        f"{new_bars} bars, {trades} trades in {sum(timings.values()):.1f}s")
+            return report
+
+
+class EndOfDayScheduler:
+    """Daemon thread that runs the pipeline at Config.EOD_RUN_TIME (IST) on trading days"""
+
+    def __init__(self, pipeline: EndOfDayPipeline):
+        self.pipeline = pipeline
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    @staticmethod
+    def next_run(now: 'pd.Timestamp') -> 'pd.Timestamp':
+        import pandas as pd
+        candidate = now.normalize() + pd.Timedelta(hours=Config.EOD_RUN_TIME.hour,
+                                                   minutes=Config.EOD_RUN_TIME.minute)
+        while candidate <= now or not is_trading_day(candidate.date()):
+            candidate += pd.Timedelta(days=1)
+        return candidate
+
+    def start(self):
+        self._thread = threading.Thread(target=self._loop, name="eod-scheduler", daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+
+    def _loop(self):
+        import pandas as pd
+
+        while not self._stop.is_set():
+            now = pd.Timestamp.now(tz=IST)
+            run_at = self.next_run(now)
+            logger.info(f"Next EOD run at {run_at}")
+            if self._stop.wait((run_at - now).total_seconds()):
+                return
+            try:
+                self.pipeline.run(run_at.date())
+            except Exception as e:
+                logger.error(f"EOD pipeline failed: {e}")
+
+
+if __name__ == '__main__':
+    # python eod_pipeline.py [--date YYYY-MM-DD] [--symbols A B ...] [--schedule]
+    from app_state import AppServices
+
+    logging.basicConfig(level=logging.INFO)
+    parser = argparse.ArgumentParser(description="End-of-day candle, backtest and screener refresh")
+    parser.add_argument('--date', type=date.fromisoformat, help="session to process (default: today, IST)")
+    parser.add_argument('--symbols', nargs='*', help="default: watchlist + every symbol in the candle store")
+    parser.add_argument('--schedule', action='store_true', help="stay running and process every trading day")
+    args = parser.parse_args()
+
+    pipeline = EndOfDayPipeline(AppServices())
+    if args.schedule:
+        scheduler = EndOfDayScheduler(pipeline)
+        scheduler.start()
+        try:
+            while True:
+                time.sleep(3600)
+        except KeyboardInterrupt:
+            scheduler.stop()
+    else:
+        print(json.dumps(pipeline.run(args.date, args.symbols), indent=2, default=str))
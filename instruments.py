@@ -0,0 +1,270 @@
+import re
+import math
+import logging
+import numpy as np
+import pandas as pd
+from datetime import date
+from typing import Dict, NamedTuple, Optional, Tuple
+from config import Config
+
+logger = logging.getLogger(__name__)
+
+INSTRUMENT_COLUMNS = ['security_id', 'symbol', 'underlying', 'instrument', 'series', 'expiry',
+                      'strike', 'option_type', 'lot_size', 'tick_size']
+
+# Dhan scrip master column (lower-cased) -> index column
+SCRIP_MASTER_COLUMNS = {
+    'sem_smst_security_id': 'security_id',
+    'sem_trading_symbol': 'symbol',
+    'sem_instrument_name': 'instrument',
+    'sem_series': 'series',
+    'sem_expiry_date': 'expiry',
+    'sem_strike_price': 'strike',
+    'sem_option_type': 'option_type',
+    'sem_lot_units': 'lot_size',
+    'sem_tick_size': 'tick_size',
+}
+
+DERIVATIVES = ('FUTIDX', 'FUTSTK', 'OPTIDX', 'OPTSTK', 'FUTCUR', 'OPTCUR', 'FUTCOM', 'OPTFUT')
+
+# Legacy security_master.csv symbols: RELIANCE-OCT2025-2800-CE / EURINR-OCT2025-FUT
+LEGACY_DERIVATIVE = re.compile(
+    r'^(?P<underlying>[^-]+)-(?P<month>[A-Z]{3})(?P<year>\d{4})-(?:(?P<strike>[\d.]+)-(?P<option_type>CE|PE)|FUT)$')
+# The legacy cache has no series: guess 'EQ' for plain names (digits only as a prefix, as in
+# 3MINDIA; NCD / bond / MF codes carry them inside), skipping SGBs and exchange test symbols
+LEGACY_EQ_SERIES = re.compile(r'^(?!SGB|.*NSETEST)\d*[A-Z][A-Z&-]*$')
+
+
+class Instrument(NamedTuple):
+    security_id: str
+    symbol: str
+    underlying: str
+    instrument: str
+    series: str
+    expiry: Optional[date]
+    strike: Optional[float]
+    option_type: Optional[str]
+    lot_size: int
+    tick_size: float
+
+
+def round_to_tick(price: float, tick: float, mode: str = "nearest") -> float:
+    """Snap a price onto the tick grid ('nearest', 'up' or 'down')"""
+    steps = price / tick
+    if mode == "up":
+        steps = math.ceil(steps - 1e-9)
+    elif mode == "down":
+        steps = math.floor(steps + 1e-9)
+    else:
+        steps = round(steps)
+    return round(steps * tick, 4)
+
+
+def normalize_scrip_master(raw: pd.DataFrame) -> pd.DataFrame:
+    """NSE rows of the full Dhan scrip master as INSTRUMENT_COLUMNS"""
+    raw = raw.rename(columns=lambda c: c.strip().lower())
+    if 'sem_exm_exch_id' in raw.columns:
+        raw = raw[raw['sem_exm_exch_id'].astype(str).str.upper().str.contains("NSE")]
+    missing = set(SCRIP_MASTER_COLUMNS) - set(raw.columns)
+    if missing:
+        raise ValueError(f"Scrip master is missing columns: {sorted(missing)}")
+
+    df = raw[list(SCRIP_MASTER_COLUMNS)].rename(columns=SCRIP_MASTER_COLUMNS)
+    df['symbol'] = df['symbol'].astype(str).str.strip().str.upper()
+    df['underlying'] = df['symbol'].str.split('-').str[0]
+    df['instrument'] = df['instrument'].astype(str).str.strip().str.upper()
+    df['series'] = df['series'].fillna('').astype(str).str.strip().str.upper()
+    df['expiry'] = pd.to_datetime(df['expiry'], errors='coerce', format='mixed').dt.normalize().where(
+        df['instrument'].isin(DERIVATIVES))
+    df['option_type'] = df['option_type'].where(df['option_type'].isin(['CE', 'PE']))
+    df['strike'] = pd.to_numeric(df['strike'], errors='coerce').where(df['option_type'].notna())
+    df['lot_size'] = pd.to_numeric(df['lot_size'], errors='coerce').fillna(1).astype(np.int64)
+    # SEM_TICK_SIZE is quoted in paise
+    df['tick_size'] = pd.to_numeric(df['tick_size'], errors='coerce') / 100
+    # Trading symbols only name the month, so weekly contracts share one: key rows by security ID
+    return df[INSTRUMENT_COLUMNS].drop_duplicates(subset='security_id').reset_index(drop=True)
+
+
+def from_legacy_master(legacy: pd.DataFrame) -> pd.DataFrame:
+    """Best-effort index columns from the old (security_id, symbol) cache.
+
+    Only month/year survive in those symbols, so expiries are set to the month's last day,
+    lot sizes are unknown (0) and the series is guessed from the symbol.
+    """
+    df = legacy[['security_id', 'symbol']].copy()
+    df['symbol'] = df['symbol'].astype(str).str.strip().str.upper()
+    parts = df['symbol'].str.extract(LEGACY_DERIVATIVE)
+    is_derivative = parts['underlying'].notna()
+    is_option = parts['option_type'].notna()
+
+    df['underlying'] = parts['underlying'].fillna(df['symbol'])
+    rolling_future = df['symbol'].str.contains(r'FUTM\d$')  # NIFTYFUTM1 continuous contracts
+    df['instrument'] = np.where(is_option, 'OPTSTK',
+                                np.where(is_derivative | rolling_future, 'FUTSTK', 'EQUITY'))
+    eq_series = (df['instrument'] == 'EQUITY') & df['symbol'].str.match(LEGACY_EQ_SERIES)
+    df['series'] = np.where(eq_series, 'EQ', '')
+    expiry = pd.to_datetime(parts['month'].str.title() + parts['year'], format='%b%Y', errors='coerce')
+    df['expiry'] = expiry + pd.offsets.MonthEnd(0)
+    df['strike'] = pd.to_numeric(parts['strike'], errors='coerce')
+    df['option_type'] = parts['option_type']
+    df['lot_size'] = 0
+    df['tick_size'] = np.nan
+    return df[INSTRUMENT_COLUMNS]
+
+
+def download_scrip_master(path: Optional[str] = None) -> 'InstrumentIndex':
+    """Fetch the full Dhan scrip master and save its NSE rows to `path`"""
+    path = path or Config.INSTRUMENT_MASTER_PATH
+    logger.info("Downloading scrip master...")
+    index = InstrumentIndex(normalize_scrip_master(pd.read_csv(Config.SCRIP_MASTER_URL, low_memory=False)))
+    index.save(path)
+    logger.info(f"✅ Saved {len(index)} NSE instruments to {path}")
+    return index
+
+
+class InstrumentIndex:
+    """Typed, columnar view of the scrip master with lookups by symbol, underlying and expiry.
+
+    Option chains are built per (underlying, expiry) on first use as strike-sorted arrays,
+    so ATM / nearest-strike lookups are a binary search.
+    """
+
+    def __init__(self, frame: pd.DataFrame):
+        self.frame = frame.reset_index(drop=True)
+        self.security_id = self.frame['security_id'].astype(str).to_numpy()
+        self.symbol = self.frame['symbol'].to_numpy()
+        self.underlying = self.frame['underlying'].to_numpy()
+        self.instrument = self.frame['instrument'].to_numpy()
+        self.series = self.frame['series'].fillna('').to_numpy()
+        self.expiry = self.frame['expiry'].to_numpy(dtype='datetime64[D]')
+        self.strike = self.frame['strike'].to_numpy(dtype=np.float64)
+        self.option_type = self.frame['option_type'].fillna('').to_numpy()
+        self.lot_size = self.frame['lot_size'].to_numpy(dtype=np.int64)
+        self.tick_size = self.frame['tick_size'].fillna(Config.DEFAULT_TICK_SIZE).to_numpy(dtype=np.float64)
+
+        self.is_derivative = np.isin(self.instrument, DERIVATIVES)
+        # Cash / index symbols only: derivative symbols are not unique (weekly expiries share one)
+        self.by_symbol: Dict[str, int] = {self.symbol[i]: int(i) for i in np.flatnonzero(~self.is_derivative)}
+        self.by_underlying: Dict[str, np.ndarray] = self.frame.groupby('underlying', sort=False).indices
+        self._expiries: Dict[str, np.ndarray] = {}
+        self._chains: Dict[Tuple[str, np.datetime64], Tuple[np.ndarray, np.ndarray, np.ndarray]] = {}
+
+    def __len__(self) -> int:
+        return len(self.frame)
+
+    @classmethod
+    def load(cls, path: str) -> 'InstrumentIndex':
+        df = pd.read_csv(path, dtype={'security_id': str, 'series': str, 'option_type': str},
+                         parse_dates=['expiry'])
+        missing = [c for c in INSTRUMENT_COLUMNS if c not in df.columns]
+        if missing:
+            logger.warning(f"{path} predates columns {missing} (run `python instruments.py`)")
+        return cls(df.reindex(columns=INSTRUMENT_COLUMNS))
+
+    @staticmethod
+    def is_current(path: str) -> bool:
+        """Whether a saved master has every INSTRUMENT_COLUMNS column"""
+        return list(pd.read_csv(path, nrows=0).columns) == INSTRUMENT_COLUMNS
+
+    def save(self, path: str):
+        self.frame.to_csv(path, index=False, date_format='%Y-%m-%d')
+
+    # =======================================================
+    # Symbol lookups
+    # =======================================================
+    def _row(self, i: int) -> Instrument:
+        expiry = self.expiry[i]
+        return Instrument(
+            security_id=self.security_id[i], symbol=self.symbol[i], underlying=self.underlying[i],
+            instrument=self.instrument[i], series=self.series[i],
+            expiry=None if np.isnat(expiry) else expiry.astype(date),
+            strike=None if np.isnan(self.strike[i]) else float(self.strike[i]),
+            option_type=self.option_type[i] or None,
+            lot_size=int(self.lot_size[i]), tick_size=float(self.tick_size[i]),
+        )
+
+    def get(self, symbol: str) -> Optional[Instrument]:
+        """Cash / index instrument by symbol (derivatives: see chain / atm_option)"""
+        i = self.by_symbol.get(symbol.strip().upper())
+        return None if i is None else self._row(i)
+
+    def security_id_for(self, symbol: str) -> Optional[str]:
+        """Cash / index security ID; exact symbol first, then the first non-derivative prefix match"""
+        symbol = symbol.strip().upper()
+        i = self.by_symbol.get(symbol)
+        if i is not None:
+            return self.security_id[i]
+        prefixed = np.flatnonzero(~self.is_derivative & np.char.startswith(self.symbol.astype(str), symbol))
+        if len(prefixed):
+            logger.warning(f"Using fallback match {self.symbol[prefixed[0]]} for symbol: {symbol}")
+            return self.security_id[prefixed[0]]
+        return None
+
+    def tick_size_for(self, symbol: str) -> float:
+        i = self.by_symbol.get(symbol.strip().upper())
+        return Config.DEFAULT_TICK_SIZE if i is None else float(self.tick_size[i])
+
+    # =======================================================
+    # Expiries and option chains
+    # =======================================================
+    def expiries(self, underlying: str) -> np.ndarray:
+        """Sorted option expiries (datetime64[D]) for an underlying"""
+        underlying = underlying.strip().upper()
+        if underlying not in self._expiries:
+            rows = self.by_underlying.get(underlying, np.array([], dtype=np.int64))
+            rows = rows[self.option_type[rows] != '']
+            self._expiries[underlying] = np.unique(self.expiry[rows][~np.isnat(self.expiry[rows])])
+        return self._expiries[underlying]
+
+    def nearest_expiry(self, underlying: str, as_of: Optional[date] = None) -> Optional[date]:
+        expiries = self.expiries(underlying)
+        i = np.searchsorted(expiries, np.datetime64(as_of or date.today(), 'D'))
+        return expiries[i].astype(date) if i < len(expiries) else None
+
+    def chain(self, underlying: str, expiry: date) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """(strikes, CE rows, PE rows) sorted by strike; a missing leg is -1"""
+        key = (underlying.strip().upper(), np.datetime64(expiry, 'D'))
+        if key not in self._chains:
+            rows = self.by_underlying.get(key[0], np.array([], dtype=np.int64))
+            rows = rows[(self.expiry[rows] == key[1]) & (self.option_type[rows] != '')]
+            strikes, slot = np.unique(self.strike[rows], return_inverse=True)
+            ce = np.full(len(strikes), -1, dtype=np.int64)
+            pe = np.full(len(strikes), -1, dtype=np.int64)
+            is_ce = self.option_type[rows] == 'CE'
+            ce[slot[is_ce]] = rows[is_ce]
+            pe[slot[~is_ce]] = rows[~is_ce]
+            self._chains[key] = (strikes, ce, pe)
+        return self._chains[key]
+
+    def nearest_strike(self, underlying: str, expiry: date, price: float) -> Optional[float]:
+        strikes = self.chain(underlying, expiry)[0]
+        if not len(strikes):
+            return None
+        i = int(np.searchsorted(strikes, price))
+        if i == len(strikes) or (i > 0 and price - strikes[i - 1] <= strikes[i] - price):
+            i -= 1
+        return float(strikes[i])
+
+    def atm_option(self, underlying: str, spot: float, option_type: str = "CE",
+                   as_of: Optional[date] = None, expiry: Optional[date] = None) -> Optional[Instrument]:
+        """At-the-money option for `spot`, nearest expiry on/after `as_of` unless `expiry` is given"""
+        expiry = expiry or self.nearest_expiry(underlying, as_of)
+        if expiry is None:
+            return None
+        strikes, ce, pe = self.chain(underlying, expiry)
+        legs = ce if option_type.upper() == "CE" else pe
+        listed = np.flatnonzero(legs >= 0)
+        if not len(listed):
+            return None
+        # Nearest listed strike for this leg (binary search over the listed subset)
+        listed_strikes = strikes[listed]
+        i = int(np.searchsorted(listed_strikes, spot))
+        if i == len(listed) or (i > 0 and spot - listed_strikes[i - 1] <= listed_strikes[i] - spot):
+            i -= 1
+        return self._row(legs[listed[i]])
+
+
+if __name__ == '__main__':
+    # python instruments.py  -> refresh instrument_master.csv (run daily; weekly expiries roll over)
+    logging.basicConfig(level=logging.INFO)
+    download_scrip_master()
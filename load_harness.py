@@ -0,0 +1,181 @@
+"""Deterministic load / latency harness for the FastAPI endpoints.
+
+Runs main.app in-process against the replay Dhan client (see api_fixtures.py) with
+isolated ledger / store paths, times every scenario and compares p95 latency and
+throughput with a saved baseline:
+
+    python load_harness.py                         # run, save load_results/<commit>.json
+    python load_harness.py --baseline load_results/abc1234.json   # exit 1 on regression
+"""
+import os
+import sys
+import json
+import time
+import asyncio
+import argparse
+import tempfile
+import subprocess
+import numpy as np
+from typing import Dict, List, Optional
+
+# Changes smaller than this are timer / scheduler noise on sub-millisecond endpoints
+MIN_DELTA_MS = 1.0
+
+# (name, method, path, query params) — run in order, so backtests populate later reads
+SCENARIOS = [
+    ('health', 'GET', '/api/health', {}),
+    ('dashboard', 'GET', '/', {}),
+    ('watchlist', 'GET', '/api/watchlist', {}),
+    ('backtest_run', 'POST', '/api/backtest/run', {'symbol': 'INFY', 'days': 30}),
+    ('backtest_results', 'GET', '/api/backtest/results', {}),
+    ('performance', 'GET', '/api/strategy/performance', {}),
+    ('performance_history', 'GET', '/api/strategy/performance', {'history': 'true'}),
+    ('trades', 'GET', '/api/trades', {'page_size': 100}),
+    ('trades_summary', 'GET', '/api/trades/summary', {'by': 'day'}),
+    ('candles', 'GET', '/api/candles/INFY', {'days': 5}),
+    ('chart', 'GET', '/api/chart/INFY', {'days': 5}),
+    ('chart_delta', 'GET', '/api/chart/INFY/delta', {'since': 0, 'days': 5}),
+    ('screener', 'GET', '/api/screener', {}),
+    ('data_quality', 'GET', '/api/data-quality', {}),
+]
+
+
+def _isolate_environment(workdir: str):
+    """Replay mode + throwaway state files; must run before config/main are imported"""
+    os.environ['DHAN_API_MODE'] = 'replay'
+    os.environ['TRADE_LEDGER_PATH'] = os.path.join(workdir, 'trades.db')
+    os.environ['WARM_STATE_ENABLED'] = '0'
+    os.environ['CANDLE_STORE_DIR'] = os.path.join(workdir, 'candle_store')
+    os.environ['SCREENER_OUTPUT_PATH'] = os.path.join(workdir, 'screener_watchlist.json')
+
+
+def _percentiles(samples: List[float]) -> Dict:
+    ms = np.asarray(samples) * 1000
+    return {
+        'p50_ms': round(float(np.percentile(ms, 50)), 2),
+        'p95_ms': round(float(np.percentile(ms, 95)), 2),
+        'p99_ms': round(float(np.percentile(ms, 99)), 2),
+        'max_ms': round(float(ms.max()), 2),
+    }
+
+
+def _has_error(response) -> bool:
+    # Endpoints report failures as {"error": ...} with a 200 status
+    if not response.headers.get('content-type', '').startswith('application/json'):
+        return False
+    body = response.json()
+    return isinstance(body, dict) and bool(body.get('error'))
+
+
+async def _run_scenarios(requests: int, concurrency: int) -> Dict:
+    import httpx
+    import main
+
+    transport = httpx.ASGITransport(app=main.app)
+    results = {}
+    async with main.lifespan(main.app):
+        async with httpx.AsyncClient(transport=transport, base_url='http://harness') as client:
+            await asyncio.get_running_loop().run_in_executor(None, main.services.get)
+            limit = asyncio.Semaphore(concurrency)
+
+            for name, method, path, params in SCENARIOS:
+                latencies, errors = [], 0
+
+                async def one():
+                    nonlocal errors
+                    async with limit:
+                        started = time.perf_counter()
+                        response = await client.request(method, path, params=params)
+                        latencies.append(time.perf_counter() - started)
+                        if response.status_code >= 400 or _has_error(response):
+                            errors += 1
+
+                started = time.perf_counter()
+                await asyncio.gather(*(one() for _ in range(requests)))
+                elapsed = time.perf_counter() - started
+                results[name] = {
+                    'requests': requests,
+                    'errors': errors,
+                    'throughput_rps': round(requests / elapsed, 1),
+                    **_percentiles(latencies),
+                }
+                print(f"{name:18s} {results[name]}")
+    return results
+
+
+def _commit() -> str:
+    try:
+        return subprocess.check_output(['git', 'rev-parse', '--short', 'HEAD'], text=True).strip()
+    except (OSError, subprocess.CalledProcessError):
+        return 'unknown'
+
+
+def compare(current: Dict, baseline: Dict, tolerance: float) -> List[str]:
+    """Scenarios whose p95 latency grew or throughput fell by more than `tolerance`"""
+    regressions = []
+    for name, now in current['scenarios'].items():
+        before = baseline['scenarios'].get(name)
+        if not before:
+            continue
+        if now['errors'] > before['errors']:
+            regressions.append(f"{name}: errors {before['errors']} -> {now['errors']}")
+        if max(now['p50_ms'] - before['p50_ms'], now['p95_ms'] - before['p95_ms']) < MIN_DELTA_MS:
+            continue
+        if now['p95_ms'] > before['p95_ms'] * (1 + tolerance):
+            regressions.append(f"{name}: p95 {before['p95_ms']}ms -> {now['p95_ms']}ms")
+        if now['throughput_rps'] < before['throughput_rps'] * (1 - tolerance):
+            regressions.append(f"{name}: throughput {before['throughput_rps']} -> {now['throughput_rps']} rps")
+    return regressions
+
+
+def main_cli(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--requests', type=int, default=20, help='requests per scenario')
+    parser.add_argument('--concurrency', type=int, default=4)
+    parser.add_argument('--baseline', help='results JSON from an earlier commit to compare against')
+    parser.add_argument('--tolerance', type=float, help='allowed relative regression (default from Config)')
+    parser.add_argument('--output', help='results path (default load_results/<commit>.json)')
+    args = parser.parse_args(argv)
+
+    baseline = None
+    if args.baseline:
+        with open(args.baseline) as f:
+            baseline = json.load(f)
+
+    workdir = tempfile.mkdtemp(prefix='load_harness_')
+    _isolate_environment(workdir)
+    from config import Config
+
+    scenarios = asyncio.run(_run_scenarios(args.requests, args.concurrency))
+    result = {
+        'commit': _commit(),
+        'recorded_at': time.strftime('%Y-%m-%dT%H:%M:%S'),
+        'requests': args.requests,
+        'concurrency': args.concurrency,
+        'replay': {'latency_ms': Config.REPLAY_LATENCY_MS, 'jitter_ms': Config.REPLAY_JITTER_MS,
+                   'error_rate': Config.REPLAY_ERROR_RATE, 'seed': Config.REPLAY_SEED,
+                   'anchor_date': Config.REPLAY_ANCHOR_DATE},
+        'scenarios': scenarios,
+    }
+    os.makedirs(Config.LOAD_RESULTS_DIR, exist_ok=True)
+    out_path = args.output or os.path.join(Config.LOAD_RESULTS_DIR, f"{result['commit']}.json")
+    with open(out_path, 'w') as f:
+        json.dump(result, f, indent=2)
+    print(f"Saved {out_path}")
+
+    if baseline:
+        tolerance = Config.LOAD_REGRESSION_TOLERANCE if args.tolerance is None else args.tolerance
+        if baseline.get('replay', {}).get('anchor_date') != Config.REPLAY_ANCHOR_DATE:
+            print(f"WARNING baseline replayed a different calendar "
+                  f"({baseline.get('replay', {}).get('anchor_date')!r} vs {Config.REPLAY_ANCHOR_DATE!r})")
+        regressions = compare(result, baseline, tolerance)
+        for line in regressions:
+            print(f"REGRESSION {line}")
+        if regressions:
+            return 1
+        print(f"No regressions vs {baseline.get('commit')}")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main_cli())
@@ -134,13 +134,18 @@ from fastapi.responses import HTMLResponse
 from fastapi.staticfiles import StaticFiles
 from fastapi.templating import Jinja2Templates
 from fastapi.middleware.cors import CORSMiddleware
-from typing import Dict, Optional
+from fastapi.middleware.gzip import GZipMiddleware
+from starlette.concurrency import run_in_threadpool
+from contextlib import asynccontextmanager
+from typing import Dict, List, Optional
+from datetime import date
 import logging
 
 from config import Config
-from strategy import TradingStrategy
-from backtest import BacktestEngine
-from dhan_client import DhanClient
+from app_state import AppServices
+from screener import current_watchlist
+from eod_pipeline import last_report
+from serialization import FastJSONResponse, candles_to_columns, trades_to_columns
 
 logging.basicConfig(
     level=logging.INFO,
@@ -149,17 +154,30 @@ logging.basicConfig(
 )
 logger = logging.getLogger(__name__)
 
-app = FastAPI()
+config = Config()
+services = AppServices()
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # Serve immediately; security master, ledger and warm state load in the background
+    services.warm_up_in_background()
+    scheduler = None
+    if Config.EOD_SCHEDULER_ENABLED:
+        from eod_pipeline import EndOfDayPipeline, EndOfDayScheduler
+        scheduler = EndOfDayScheduler(EndOfDayPipeline(services))
+        scheduler.start()
+    yield
+    if scheduler:
+        scheduler.stop()
+    services.save_warm_state()
+
+app = FastAPI(default_response_class=FastJSONResponse, lifespan=lifespan)
 app.add_middleware(
     CORSMiddleware,
     allow_origins=["*"], allow_credentials=True,
     allow_methods=["*"], allow_headers=["*"],
 )
-
-config = Config()
-dhan_client = DhanClient()
-strategy = TradingStrategy()
-backtest_engine = BacktestEngine(strategy)
+app.add_middleware(GZipMiddleware, minimum_size=1024)
 
 app.mount("/static", StaticFiles(directory="static"), name="static")
 templates = Jinja2Templates(directory="templates")
@@ -169,22 +187,23 @@ async def index(request: Request):
     return templates.TemplateResponse("index.html", {"request": request})
 
 @app.post("/api/backtest/run")
-async def run_backtest(symbol: Optional[str] = None, days: int = 30):
-    """Run strategy backtest"""
+async def run_backtest(symbol: Optional[str] = None, days: int = 30, layout: str = "rows"):
+    """Run strategy backtest (layout=columnar returns trades as per-field arrays)"""
+    svc = await run_in_threadpool(services.get)
     print(7)
     try:
         results = {}
-        symbols_to_test = [symbol] if symbol else list(config.WATCHLIST_STOCKS)
+        symbols_to_test = [symbol] if symbol else current_watchlist()
 
         for sym in symbols_to_test:
             logger.info(f"Running backtest for {sym}...")
 
-            security_id = dhan_client.get_security_id(sym)
+            security_id = svc.dhan_client.get_security_id(sym)
             if not security_id:
                 results[sym] = {'error': f'Security ID not found for {sym}'}
                 continue
 
-            df_3min = dhan_client.get_historical_data(security_id, days)
+            df_3min = svc.dhan_client.get_historical_data(security_id, days)
             print(8)
             if df_3min is None:
                 logger.error("DataFrame is None — likely due to data fetch failure.")
@@ -201,11 +220,13 @@ async def run_backtest(symbol: Optional[str] = None, days: int = 30):
                 logger.info(f"Total rows: {len(df_3min)}")
             print(11)
 
+            svc.candle_store.append(sym, df_3min)
+
             if len(df_3min) < 100:
                 results[sym] = {'error': 'Insufficient data for analysis'}
                 continue
 
-            backtest_result = backtest_engine.run_backtest(df_3min, sym)
+            backtest_result = svc.backtest_engine.run_backtest(df_3min, sym)
 
             total_trades = backtest_result.get("total_trades", 0)
             winning_trades = backtest_result.get("winning_trades", 0)
@@ -213,11 +234,14 @@ async def run_backtest(symbol: Optional[str] = None, days: int = 30):
 
             backtest_result["win_rate"] = win_rate
             backtest_result["total_pnl"] = float(backtest_result.get("total_pnl", 0))
+            if layout == "columnar":
+                backtest_result["trades"] = trades_to_columns(backtest_result.get("trades", []))
+                backtest_result["daily_trades"] = trades_to_columns(backtest_result.get("daily_trades", []))
 
             results[sym] = backtest_result
             logger.info(f"Backtest completed for {sym}: {total_trades} trades, win_rate={win_rate}%")
         print(12)
-        return results
+        return FastJSONResponse(results)
 
     except Exception as e:
         logger.error(f"Error running backtest: {str(e)}")
@@ -226,32 +250,159 @@ async def run_backtest(symbol: Optional[str] = None, days: int = 30):
 
 @app.get("/api/backtest/results")
 async def get_backtest_results():
+    svc = await run_in_threadpool(services.get)
     print(6)
-    return backtest_engine.trades
+    return FastJSONResponse(svc.backtest_engine.trades)
 
 @app.get("/api/strategy/performance")
-async def get_strategy_performance():
-    if not backtest_engine.trades:
-        return {"error": "No backtest results available"}
-    
-    total_trades = sum(r.get('total_trades', 0) for r in backtest_engine.trades.values() if 'error' not in r)
-    total_wins = sum(r.get('winning_trades', 0) for r in backtest_engine.trades.values() if 'error' not in r)
-    total_pnl = sum(r.get('total_pnl', 0) for r in backtest_engine.trades.values() if 'error' not in r)
-    all_trades = sum((r.get('trades', []) for r in backtest_engine.trades.values() if 'error' not in r), [])
-
-    overall_win_rate = round((total_wins / total_trades * 100), 2) if total_trades else 0
-
-    return {
-        "overall_trades": total_trades,
-        "overall_wins": total_wins,
-        "overall_win_rate": overall_win_rate,
-        "overall_pnl": round(total_pnl, 2),
-        "recent_trades": all_trades[-10:]
-    }
+async def get_strategy_performance(history: bool = False, symbol: Optional[str] = None,
+                                   start_date: Optional[date] = None, end_date: Optional[date] = None,
+                                   source: Optional[str] = None):
+    """Equity curve, drawdown, per-day / per-symbol PnL and risk ratios.
+
+    Uses the last backtest run by default, or the full trade ledger with `history=true` (also
+    the fallback after a restart, when no backtest has run yet). Unfiltered-by-symbol history
+    is served at day resolution from the ledger's summary tables, so it costs the same at any
+    ledger size. Everything is net of charges and slippage except `overall_pnl_gross`.
+    """
+    from performance import concat_arrays, filter_by_date, performance_report, summary_report
+
+    svc = await run_in_threadpool(services.get)
+    history = history or not svc.backtest_engine.trades
+    if history:
+        filters = dict(symbol=symbol, start_date=start_date, end_date=end_date, source=source)
+        recent = (await run_in_threadpool(svc.trade_ledger.query, 1, 10, **filters))['trades']
+        if not symbol:
+            daily = await run_in_threadpool(svc.trade_ledger.totals, 'day', **filters)
+            by_symbol = await run_in_threadpool(svc.trade_ledger.totals, 'symbol', **filters)
+            if not len(daily['day']):
+                return {"error": "No closed trades"}
+            report = await run_in_threadpool(summary_report, daily, by_symbol)
+            return _performance_payload(report, history, daily['pnl'].sum(), daily['charges'].sum(),
+                                        daily['slippage'].sum(), recent)
+        arrays = await run_in_threadpool(svc.trade_ledger.arrays, **filters)
+    else:
+        parts = svc.backtest_engine.trade_arrays
+        if symbol:
+            parts = {k: v for k, v in parts.items() if k == symbol.upper()}
+        arrays = filter_by_date(concat_arrays(list(parts.values())), start_date, end_date)
+        recent = [t for sym, r in svc.backtest_engine.trades.items()
+                  if 'error' not in r and (not symbol or sym == symbol.upper())
+                  for t in r.get('trades', [])
+                  if (not start_date or t['exit_time'].date() >= start_date)
+                  and (not end_date or t['exit_time'].date() <= end_date)][-10:]
+    if not len(arrays['pnl']):
+        return {"error": "No closed trades"}
+
+    report = await run_in_threadpool(performance_report, arrays, 'net_pnl')
+    return _performance_payload(report, history, arrays['pnl'].sum(), arrays['charges'].sum(),
+                                arrays['slippage'].sum(), recent)
+
+def _performance_payload(report: Dict, history: bool, gross: float, charges: float, slippage: float,
+                         recent: List[Dict]) -> FastJSONResponse:
+    return FastJSONResponse({
+        "basis": "net",
+        "history": history,
+        "overall_trades": report['total_trades'],
+        "overall_wins": report['winning_trades'],
+        "overall_win_rate": report['win_rate'],
+        "overall_pnl_gross": round(float(gross), 2),
+        "overall_pnl_net": report['total_pnl'],
+        "total_charges": round(float(charges), 2),
+        "total_slippage": round(float(slippage), 2),
+        "recent_trades": recent,
+        **report,
+    })
+
+@app.get("/api/trades")
+async def get_trades(symbol: Optional[str] = None, start_date: Optional[date] = None,
+                     end_date: Optional[date] = None, exit_reason: Optional[str] = None,
+                     source: Optional[str] = None, page: int = 1, page_size: int = 100):
+    """Paginated full trade history from the ledger"""
+    svc = await run_in_threadpool(services.get)
+    return FastJSONResponse(svc.trade_ledger.query(
+        page=page, page_size=page_size, symbol=symbol, start_date=start_date,
+        end_date=end_date, exit_reason=exit_reason, source=source))
+
+@app.get("/api/trades/summary")
+async def get_trades_summary(by: str = "day", symbol: Optional[str] = None,
+                             start_date: Optional[date] = None, end_date: Optional[date] = None,
+                             exit_reason: Optional[str] = None, source: Optional[str] = None):
+    """Trade aggregates grouped by day, symbol or exit_reason"""
+    svc = await run_in_threadpool(services.get)
+    try:
+        return FastJSONResponse({"by": by, "groups": svc.trade_ledger.aggregate(
+            by=by, symbol=symbol, start_date=start_date, end_date=end_date,
+            exit_reason=exit_reason, source=source)})
+    except ValueError as e:
+        return {"error": str(e)}
+
+def _candle_columns(svc, symbol: str, days: int) -> Dict:
+    security_id = svc.dhan_client.get_security_id(symbol)
+    if not security_id:
+        return {"error": f"Security ID not found for {symbol}"}
+
+    df_3min = svc.dhan_client.get_historical_data(security_id, days)
+    if df_3min is None or df_3min.empty:
+        return {"error": "No data returned from API"}
+
+    df_3min = svc.strategy.analyze_candle_data(df_3min)
+    return {"symbol": symbol.upper(), **candles_to_columns(df_3min)}
+
+@app.get("/api/candles/{symbol}")
+async def get_candles(symbol: str, days: int = 5):
+    """3-minute candles + SMA_50 as column arrays for charting"""
+    svc = await run_in_threadpool(services.get)
+    # Dhan fetch + indicators are blocking; keep them off the event loop
+    return FastJSONResponse(await run_in_threadpool(_candle_columns, svc, symbol, days))
+
+@app.get("/api/chart/{symbol}")
+async def get_chart(symbol: str, days: int = 5, max_points: int = Config.CHART_MAX_POINTS):
+    """Downsampled candles, SMA_50 and setup/rejection markers (initial chart view)"""
+    svc = await run_in_threadpool(services.get)
+    series = await run_in_threadpool(svc.chart_feed.get_series, symbol, days)
+    if series is None:
+        return {"error": f"No chart data for {symbol}"}
+    return FastJSONResponse(await run_in_threadpool(series.snapshot, max_points))
+
+@app.get("/api/chart/{symbol}/delta")
+async def get_chart_delta(symbol: str, since: int = 0, days: int = 5):
+    """Bars added or changed after sequence number `since`"""
+    svc = await run_in_threadpool(services.get)
+    series = await run_in_threadpool(svc.chart_feed.get_series, symbol, days)
+    if series is None:
+        return {"error": f"No chart data for {symbol}"}
+    return FastJSONResponse(await run_in_threadpool(series.delta, since))
 
 @app.get("/api/watchlist")
 async def get_watchlist():
-    return {"watchlist": config.WATCHLIST_STOCKS}
+    return {"watchlist": current_watchlist()}
+
+@app.get("/api/screener")
+async def get_screener(top_n: int = Config.SCREENER_TOP_N, save: bool = False):
+    """Rank cached equities by trend strength vs SMA_50 (save=true makes it today's watchlist)"""
+    svc = await run_in_threadpool(services.get)
+    result = await run_in_threadpool(svc.screener.screen, None, None, top_n)
+    if save:
+        svc.screener.save(result)
+    return FastJSONResponse(result)
+
+@app.get("/api/data-quality")
+async def get_data_quality():
+    """Validation report for the last 1-minute fetch of each symbol"""
+    svc = await run_in_threadpool(services.get)
+    symbols = {sid: sym for sym, sid in svc.dhan_client.security_id_cache.items()}
+    return {symbols.get(sid, sid): report for sid, report in svc.dhan_client.quality_reports.items()}
+
+@app.get("/api/eod/report")
+async def get_eod_report():
+    """Summary of the last end-of-day pipeline run"""
+    return last_report() or {"error": "End-of-day pipeline has not run yet"}
+
+@app.get("/api/health")
+async def get_health():
+    """Liveness + readiness (heavy components loaded, warm state restored)"""
+    return services.status()
 
 if __name__ == '__main__':
     import uvicorn
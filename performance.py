@@ -0,0 +1,225 @@
+import numpy as np
+import pandas as pd
+from datetime import date
+from typing import Dict, List, Optional
+from config import Config
+
+IST_OFFSET = 5 * 3600 + 30 * 60
+TRADING_DAYS_PER_YEAR = 252
+
+# Columnar trade set: one array per field, aligned by trade
+ARRAY_FIELDS = ('exit_ts', 'symbol_code', 'pnl', 'net_pnl', 'charges', 'slippage')
+
+
+def trade_arrays(trades: List[Dict]) -> Dict[str, np.ndarray]:
+    """Closed trade dicts -> columnar arrays (symbols factorised into `symbols` + `symbol_code`)"""
+    closed = [t for t in trades if t.get('status', 'CLOSED') == 'CLOSED']
+    n = len(closed)
+    codes, symbols = pd.factorize(pd.Series([t['symbol'] for t in closed], dtype=object))
+    exit_ts = pd.to_datetime(pd.Series([t['exit_time'] for t in closed], dtype=object), utc=True)
+    return {
+        'exit_ts': exit_ts.to_numpy(dtype='datetime64[s]').astype(np.int64) if n else np.zeros(0, np.int64),
+        'symbol_code': codes.astype(np.int64),
+        'symbols': np.asarray(symbols, dtype=object),
+        'pnl': np.fromiter((t['pnl'] for t in closed), np.float64, n),
+        'net_pnl': np.fromiter((t.get('net_pnl', t['pnl']) for t in closed), np.float64, n),
+        'charges': np.fromiter((t.get('charges', 0) for t in closed), np.float64, n),
+        'slippage': np.fromiter((t.get('slippage', 0) for t in closed), np.float64, n),
+    }
+
+
+def concat_arrays(parts: List[Dict[str, np.ndarray]]) -> Dict[str, np.ndarray]:
+    """Merge per-symbol trade arrays, re-coding symbols against the combined symbol list"""
+    parts = [p for p in parts if p is not None and len(p['pnl'])]
+    if not parts:
+        return trade_arrays([])
+    symbols, inverse = np.unique(np.concatenate([p['symbols'] for p in parts]).astype(str), return_inverse=True)
+    offsets = np.cumsum([0] + [len(p['symbols']) for p in parts])
+    merged = {f: np.concatenate([p[f] for p in parts]) for f in ARRAY_FIELDS if f != 'symbol_code'}
+    merged['symbol_code'] = np.concatenate([inverse[offsets[k]:offsets[k + 1]][p['symbol_code']]
+                                            for k, p in enumerate(parts)])
+    merged['symbols'] = symbols.astype(object)
+    return merged
+
+
+def filter_by_date(arrays: Dict[str, np.ndarray], start_date: Optional[date] = None,
+                   end_date: Optional[date] = None) -> Dict[str, np.ndarray]:
+    """Trades whose exit falls within [start_date, end_date] (IST days)"""
+    if start_date is None and end_date is None:
+        return arrays
+    day = ((arrays['exit_ts'] + IST_OFFSET) // 86400).astype('datetime64[D]')
+    mask = np.ones(len(day), dtype=bool)
+    if start_date is not None:
+        mask &= day >= np.datetime64(start_date, 'D')
+    if end_date is not None:
+        mask &= day <= np.datetime64(end_date, 'D')
+    return {k: (v if k == 'symbols' else v[mask]) for k, v in arrays.items()}
+
+
+def _streaks(pnl: np.ndarray) -> Dict:
+    """Longest and current runs of winning / losing trades (flat trades break a run)"""
+    sign = (pnl > 0).view(np.int8) - (pnl < 0).view(np.int8)
+    starts = np.append(0, np.flatnonzero(sign[1:] != sign[:-1]) + 1)
+    lengths = np.diff(np.append(starts, len(sign)))
+    run_sign = sign[starts]
+    return {
+        'max_win_streak': int(lengths[run_sign > 0].max(initial=0)),
+        'max_loss_streak': int(lengths[run_sign < 0].max(initial=0)),
+        'current_streak': int(lengths[-1] * run_sign[-1]) if len(lengths) else 0,
+    }
+
+
+def _ratio(mean: float, deviation: float) -> Optional[float]:
+    if not np.isfinite(deviation) or deviation <= 0:
+        return None
+    return round(float(mean / deviation * np.sqrt(TRADING_DAYS_PER_YEAR)), 3)
+
+
+def _sample(n: int, points: int) -> np.ndarray:
+    """Evenly spaced indices (always keeping the last one) for long curves"""
+    if n <= points:
+        return np.arange(n)
+    return np.unique(np.append(np.linspace(0, n - 1, points).astype(np.int64), n - 1))
+
+
+def _drawdown(t: np.ndarray, pnl: np.ndarray, curve_points: int) -> Dict:
+    """Equity curve and drawdown from the running peak (starting at 0), one point per pnl step"""
+    equity = np.cumsum(pnl)
+    peak = np.maximum.accumulate(np.maximum(equity, 0.0))
+    drawdown = equity - peak
+    trough = int(np.argmin(drawdown))
+    at_peak = np.flatnonzero(equity[:trough + 1] >= peak[trough])
+    peak_at = int(at_peak[-1]) if len(at_peak) else 0
+    runs = np.diff(np.concatenate(([0], (drawdown < 0).astype(np.int8), [0])))
+    idx = _sample(len(pnl), curve_points)
+    return {
+        'total_pnl': round(float(equity[-1]), 2),
+        'max_drawdown': round(float(-drawdown[trough]), 2),
+        'max_drawdown_start': int(t[peak_at]),
+        'max_drawdown_end': int(t[trough]),
+        'longest_underwater': int((np.flatnonzero(runs == -1) - np.flatnonzero(runs == 1)).max(initial=0)),
+        'equity_curve': {
+            't': t[idx], 'equity': np.round(equity[idx], 2), 'drawdown': np.round(drawdown[idx], 2),
+            'sampled': len(idx) < len(pnl),
+        },
+    }
+
+
+def _daily(dates: List[str], daily_pnl: np.ndarray, daily_trades: np.ndarray) -> Dict:
+    """Sharpe / Sortino (annualised from days that had trades) and the per-day series"""
+    downside = np.sqrt(np.mean(np.minimum(daily_pnl, 0.0) ** 2))
+    return {
+        'trading_days': len(dates),
+        'sharpe_ratio': _ratio(daily_pnl.mean(), daily_pnl.std(ddof=1) if len(daily_pnl) > 1 else np.nan),
+        'sortino_ratio': _ratio(daily_pnl.mean(), downside),
+        'best_day': round(float(daily_pnl.max()), 2),
+        'worst_day': round(float(daily_pnl.min()), 2),
+        'daily': {'date': dates, 'pnl': np.round(daily_pnl, 2), 'trades': daily_trades},
+    }
+
+
+def _by_symbol(symbols: np.ndarray, trades: np.ndarray, wins: np.ndarray, pnl: np.ndarray) -> List[Dict]:
+    return [
+        {'symbol': symbols[k], 'trades': int(trades[k]), 'winning_trades': int(wins[k]),
+         'pnl': round(float(pnl[k]), 2)}
+        for k in np.argsort(-pnl, kind='stable')
+    ]
+
+
+def performance_report(arrays: Dict[str, np.ndarray], pnl_field: str = 'net_pnl',
+                       curve_points: Optional[int] = None) -> Dict:
+    """Equity curve, drawdown, per-day / per-symbol PnL, Sharpe/Sortino and streaks.
+
+    Everything is computed with whole-array operations on exit-time ordered trades;
+    Sharpe and Sortino are annualised from daily PnL on days that had trades. The
+    equity curve is sampled down to `curve_points`.
+    """
+    pnl = arrays[pnl_field]
+    n = len(pnl)
+    if not n:
+        return {'total_trades': 0}
+    curve_points = curve_points or Config.EQUITY_CURVE_POINTS
+
+    exit_ts = arrays['exit_ts']
+    if np.any(exit_ts[1:] < exit_ts[:-1]):
+        order = np.argsort(exit_ts, kind='stable')
+        exit_ts, pnl, codes = exit_ts[order], pnl[order], arrays['symbol_code'][order]
+    else:
+        codes = arrays['symbol_code']
+    curve = _drawdown(exit_ts, pnl, curve_points)
+
+    # Per-day sums: days are non-decreasing in exit order, so groups are contiguous
+    day = (exit_ts + IST_OFFSET) // 86400
+    day_starts = np.flatnonzero(np.diff(day, prepend=day[0] - 1))
+    daily = _daily(day[day_starts].astype('datetime64[D]').astype(str).tolist(),
+                   np.add.reduceat(pnl, day_starts), np.diff(np.append(day_starts, n)))
+
+    # Per-symbol sums over the dense symbol codes
+    symbols = arrays['symbols']
+    symbol_pnl = np.bincount(codes, weights=pnl, minlength=len(symbols))
+    symbol_trades = np.bincount(codes, minlength=len(symbols))
+    symbol_wins = np.bincount(codes, weights=pnl > 0, minlength=len(symbols))
+
+    wins, losses = pnl[pnl > 0], pnl[pnl < 0]
+    return {
+        'resolution': 'trade',
+        'total_trades': n,
+        'winning_trades': int(len(wins)),
+        'losing_trades': int(len(losses)),
+        'win_rate': round(len(wins) / n * 100, 2),
+        'total_pnl': curve['total_pnl'],
+        'avg_win': round(float(wins.mean()), 2) if len(wins) else 0.0,
+        'avg_loss': round(float(losses.mean()), 2) if len(losses) else 0.0,
+        'profit_factor': round(float(wins.sum() / -losses.sum()), 3) if len(losses) else None,
+        'expectancy': round(float(pnl.mean()), 2),
+        'max_drawdown': curve['max_drawdown'],
+        'max_drawdown_start': curve['max_drawdown_start'],
+        'max_drawdown_end': curve['max_drawdown_end'],
+        'longest_drawdown_trades': curve['longest_underwater'],
+        **{k: v for k, v in daily.items() if k != 'daily'},
+        **_streaks(pnl),
+        'equity_curve': curve['equity_curve'],
+        'daily': daily['daily'],
+        'by_symbol': _by_symbol(symbols, symbol_trades, symbol_wins, symbol_pnl),
+    }
+
+
+def summary_report(daily: Dict[str, np.ndarray], by_symbol: Dict[str, np.ndarray],
+                   curve_points: Optional[int] = None) -> Dict:
+    """performance_report at day resolution, from TradeLedger.totals() ('day' / 'symbol').
+
+    Net PnL basis. The equity curve and drawdown step once per day and streaks are not
+    available, but cost no longer grows with the number of trades.
+    """
+    n = int(daily['trades'].sum())
+    if not n:
+        return {'total_trades': 0}
+    curve_points = curve_points or Config.EQUITY_CURVE_POINTS
+
+    dates = daily['day'].astype(str)
+    day_ts = dates.astype('datetime64[D]').astype('datetime64[s]').astype(np.int64) - IST_OFFSET
+    pnl = daily['net_pnl']
+    curve = _drawdown(day_ts, pnl, curve_points)
+    wins, losses = int(daily['net_wins'].sum()), int(daily['net_losses'].sum())
+    win_pnl, loss_pnl = float(daily['net_win_pnl'].sum()), float(daily['net_loss_pnl'].sum())
+    return {
+        'resolution': 'day',
+        'total_trades': n,
+        'winning_trades': wins,
+        'losing_trades': losses,
+        'win_rate': round(wins / n * 100, 2),
+        'total_pnl': curve['total_pnl'],
+        'avg_win': round(win_pnl / wins, 2) if wins else 0.0,
+        'avg_loss': round(loss_pnl / losses, 2) if losses else 0.0,
+        'profit_factor': round(win_pnl / -loss_pnl, 3) if losses else None,
+        'expectancy': round(float(pnl.sum()) / n, 2),
+        'max_drawdown': curve['max_drawdown'],
+        'max_drawdown_start': curve['max_drawdown_start'],
+        'max_drawdown_end': curve['max_drawdown_end'],
+        'longest_drawdown_days': curve['longest_underwater'],
+        **_daily(dates.tolist(), pnl, daily['trades'].astype(np.int64)),
+        'max_win_streak': None, 'max_loss_streak': None, 'current_streak': None,
+        'equity_curve': curve['equity_curve'],
+        'by_symbol': _by_symbol(by_symbol['symbol'], by_symbol['trades'], by_symbol['net_wins'],
+                                by_symbol['net_pnl']),
+    }
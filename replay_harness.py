@@ -0,0 +1,134 @@
+import sys
+import time
+import logging
+import numpy as np
+import pandas as pd
+from typing import Dict, List
+from config import Config
+from strategy import TradingStrategy
+from backtest import BacktestEngine
+from candles import CandleArray
+
+logger = logging.getLogger(__name__)
+
+SMA_TOLERANCE = 1e-6
+
+
+class DifferentialReplay:
+    """Streams historical candles through both TradingStrategy paths and reports divergence.
+
+    Row-wise (live) path:  can_trade / should_enter / enter_trade on `candles[i]` rows.
+    Backtest path:         check_10am_signal / find_rejection_candle via BacktestEngine sessions.
+    """
+
+    def __init__(self):
+        self.config = Config()
+
+    def _row_path(self, candles: CandleArray, sessions: np.ndarray) -> Dict[int, Dict]:
+        strategy = TradingStrategy()
+        session_of_bar = np.repeat(np.arange(len(sessions)), sessions[:, 1] - sessions[:, 0])
+        out = {}
+        for i in range(len(candles)):
+            if i > 0 and session_of_bar[i] != session_of_bar[i - 1]:
+                strategy.position = None  # live loop squares off at EOD; check_exit is a stub
+
+            if not strategy.can_trade(candles, i):
+                continue
+            record = out.setdefault(int(session_of_bar[i]), {})
+            record['sma'] = strategy.get_sma(candles, i, self.config.SMA_PERIOD)
+            if strategy.should_enter(candles, i) and i + 3 < len(candles):
+                position = strategy.enter_trade(candles, i)
+                record['entry_index'] = i + 3
+                record['entry_price'] = float(position['entry_price'])
+            elif strategy.rejected_day == candles[i]['timestamp'].date().isoformat():
+                record['rejected'] = True
+        return out
+
+    def _backtest_path(self, df: pd.DataFrame, sessions: np.ndarray) -> Dict[int, Dict]:
+        engine = BacktestEngine(TradingStrategy())
+        out = {}
+        for s, (start, end, setup_index) in enumerate(sessions):
+            if setup_index < 0:
+                continue
+            record = out.setdefault(s, {})
+            record['sma'] = df['SMA_50'].iat[setup_index]
+            record['setup'] = engine.strategy.check_10am_signal(df, setup_index)
+            entry = engine._run_session(df, end, setup_index) if record['setup'] else None
+            if entry:
+                record['entry_index'] = entry['entry_index']
+                record['entry_price'] = float(entry['entry_price'])
+        return out
+
+    def run(self, df: pd.DataFrame, symbol: str = "") -> Dict:
+        """Replay `df` (3-minute candles) through both paths; returns summary + divergent sessions"""
+        df = TradingStrategy().analyze_candle_data(df)
+        candles = CandleArray(df)
+        sessions = BacktestEngine._session_index(candles.frame)
+
+        started = time.perf_counter()
+        row = self._row_path(candles, sessions)
+        row_seconds = time.perf_counter() - started
+
+        started = time.perf_counter()
+        backtest = self._backtest_path(candles.frame, sessions)
+        backtest_seconds = time.perf_counter() - started
+
+        counts = {'sma_mismatch': 0, 'entry_only_row': 0, 'entry_only_backtest': 0,
+                  'entry_bar_mismatch': 0, 'entry_price_mismatch': 0}
+        divergences: List[Dict] = []
+        for s in sorted(set(row) | set(backtest)):
+            r, b = row.get(s, {}), backtest.get(s, {})
+            reasons = []
+            if r.get('sma') is not None and not pd.isna(b.get('sma')) \
+                    and abs(r['sma'] - b['sma']) > SMA_TOLERANCE * abs(b['sma']):
+                reasons.append('sma_mismatch')
+            if 'entry_index' in r and 'entry_index' not in b:
+                reasons.append('entry_only_row')
+            elif 'entry_index' in b and 'entry_index' not in r:
+                reasons.append('entry_only_backtest')
+            elif 'entry_index' in r:
+                if r['entry_index'] != b['entry_index']:
+                    reasons.append('entry_bar_mismatch')
+                elif abs(r['entry_price'] - b['entry_price']) > 0.011:
+                    reasons.append('entry_price_mismatch')
+            for reason in reasons:
+                counts[reason] += 1
+            if reasons:
+                divergences.append({
+                    'date': str(candles.timestamps[sessions[s][0]].date()),
+                    'reasons': reasons, 'row': r, 'backtest': b,
+                })
+
+        bars = len(candles)
+        return {
+            'symbol': symbol,
+            'bars': bars,
+            'sessions': len(sessions),
+            'row_entries': sum('entry_index' in r for r in row.values()),
+            'backtest_entries': sum('entry_index' in b for b in backtest.values()),
+            'divergent_sessions': len(divergences),
+            'divergence_counts': counts,
+            'throughput_bars_per_second': {
+                'row_path': round(bars / row_seconds) if row_seconds else None,
+                'backtest_path': round(bars / backtest_seconds) if backtest_seconds else None,
+            },
+            'divergences': divergences,
+        }
+
+
+if __name__ == '__main__':
+    # python replay_harness.py SYMBOL [SYMBOL ...]  — replays candles from the local candle store
+    from candle_store import CandleStore
+
+    logging.basicConfig(level=logging.INFO)
+    store = CandleStore()
+    replay = DifferentialReplay()
+    for symbol in sys.argv[1:] or store.symbols()[:10]:
+        df = store.to_frame(symbol)
+        if df is None:
+            print(f"{symbol}: not in candle store")
+            continue
+        report = replay.run(df, symbol)
+        print(f"{symbol}: {report['sessions']} sessions, row entries={report['row_entries']}, "
+              f"backtest entries={report['backtest_entries']}, divergent={report['divergent_sessions']} "
+              f"{report['divergence_counts']} throughput={report['throughput_bars_per_second']}")
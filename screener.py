@@ -0,0 +1,142 @@
+import os
+import re
+import json
+import time
+import logging
+import numpy as np
+from datetime import date, datetime
+from typing import TYPE_CHECKING, Dict, List, Optional
+from config import Config
+
+if TYPE_CHECKING:
+    from candle_store import CandleStore
+
+logger = logging.getLogger(__name__)
+
+# Plain NSE cash symbols: no derivative suffixes, no G-secs/SDLs (leading digit), no ETFs/SGBs
+# ETFs trade as EQUITY in the EQ series too; the name is the only tell
+NON_EQUITY = re.compile(r'ETF|BEES$')
+
+
+def _pct_rank(values: np.ndarray) -> np.ndarray:
+    """Rank in [0, 1] (ties broken by order), NaN-safe"""
+    order = np.argsort(np.nan_to_num(values, nan=-np.inf), kind='stable')
+    ranks = np.empty(len(values))
+    ranks[order] = np.arange(len(values))
+    return ranks / max(1, len(values) - 1)
+
+
+def equity_universe(security_master_df) -> List[str]:
+    """Cash-market stocks: EQUITY instruments in the EQ series (drops NCDs, MF units, indices, ETFs)"""
+    df = security_master_df
+    symbols = df['symbol'].astype(str)
+    mask = (df['instrument'] == 'EQUITY') & (df['series'] == 'EQ') & ~symbols.str.contains(NON_EQUITY)
+    return sorted(symbols[mask].unique())
+
+
+class UniverseScreener:
+    """Ranks the equity universe by trend strength vs SMA_50 using cached candles"""
+
+    def __init__(self, store: 'CandleStore', dhan_client=None):
+        self.store = store
+        self.dhan_client = dhan_client
+        self.config = Config()
+
+    def universe(self) -> List[str]:
+        cached = self.store.symbols()
+        if self.dhan_client is None:
+            return cached
+        listed = set(equity_universe(self.dhan_client.security_master_df))
+        return [s for s in cached if s in listed]
+
+    def screen(self, symbols: Optional[List[str]] = None, as_of: Optional[int] = None,
+               top_n: Optional[int] = None) -> Dict:
+        """Score symbols on SMA distance, SMA slope and liquidity; return the top_n as a watchlist"""
+        started = time.perf_counter()
+        symbols = symbols if symbols is not None else self.universe()
+        top_n = top_n or self.config.SCREENER_TOP_N
+        period, k = self.config.SMA_PERIOD, self.config.SCREENER_SLOPE_BARS
+        panel = self.store.load_panel(symbols, period + k, as_of=as_of)
+        close, volume = panel['c'], panel['v']
+
+        valid = ~np.isnan(close).any(axis=1)
+        with np.errstate(invalid='ignore', divide='ignore'):
+            sma_now = close[:, -period:].mean(axis=1)
+            sma_prev = close[:, -period - k:-k].mean(axis=1)
+            distance = (close[:, -1] - sma_now) / sma_now
+            slope = (sma_now - sma_prev) / sma_prev / k
+            turnover = np.median(close * volume, axis=1)
+
+        # A trend only counts when price and SMA slope agree in direction
+        direction = np.sign(distance)
+        eligible = (valid & (direction != 0) & (direction == np.sign(slope))
+                    & (turnover >= self.config.SCREENER_MIN_TURNOVER))
+        score = (_pct_rank(np.where(eligible, np.abs(distance), np.nan))
+                 + _pct_rank(np.where(eligible, np.abs(slope), np.nan))
+                 + 0.5 * _pct_rank(np.where(eligible, np.log1p(turnover), np.nan)))
+        score[~eligible] = -np.inf
+
+        top = np.argsort(-score, kind='stable')[:min(top_n, int(eligible.sum()))]
+        watchlist = [{
+            'symbol': str(panel['symbols'][i]),
+            'direction': 'LONG' if direction[i] > 0 else 'SHORT',
+            'score': round(float(score[i]), 4),
+            'sma_distance_pct': round(float(distance[i]) * 100, 3),
+            'sma_slope_pct': round(float(slope[i]) * 100, 5),
+            'turnover': round(float(turnover[i]), 2),
+        } for i in top]
+
+        # Too few eligible names: fill up with the configured defaults so the day still has a full list
+        padded = [s for s in self.config.WATCHLIST_STOCKS
+                  if s not in {w['symbol'] for w in watchlist}][:max(0, top_n - len(watchlist))]
+        watchlist += [{'symbol': s, 'direction': None, 'score': None, 'sma_distance_pct': None,
+                       'sma_slope_pct': None, 'turnover': None} for s in padded]
+
+        elapsed = time.perf_counter() - started
+        logger.info(f"Screened {len(symbols)} symbols ({int(eligible.sum())} eligible) in {elapsed:.2f}s")
+        return {
+            'as_of': int(as_of) if as_of else int(panel['t_last'].max(initial=0)),
+            'screened': len(symbols),
+            'eligible': int(eligible.sum()),
+            'padded': len(padded),
+            'elapsed_seconds': round(elapsed, 3),
+            'watchlist': watchlist,
+        }
+
+    # =======================================================
+    # Daily watchlist persistence
+    # =======================================================
+    def save(self, result: Dict, path: Optional[str] = None, valid_for: Optional[date] = None) -> str:
+        """Write the watchlist, valid from today through `valid_for` (e.g. the next session after an EOD run)"""
+        path = path or self.config.SCREENER_OUTPUT_PATH
+        today = datetime.now().date()
+        result = {**result, 'date': today.isoformat(), 'valid_for': max(valid_for or today, today).isoformat()}
+        with open(path, 'w') as f:
+            json.dump(result, f, indent=2)
+        return path
+
+
+def current_watchlist(path: Optional[str] = None) -> List[str]:
+    """The screened watchlist covering today, else Config.WATCHLIST_STOCKS"""
+    path = path or Config.SCREENER_OUTPUT_PATH
+    if os.path.exists(path):
+        try:
+            with open(path) as f:
+                result = json.load(f)
+            today = datetime.now().date().isoformat()
+            if result.get('date', '') <= today <= result.get('valid_for', result.get('date', '')) \
+                    and result.get('watchlist'):
+                return [w['symbol'] for w in result['watchlist']]
+        except (OSError, ValueError) as e:
+            logger.warning(f"Could not read screener output: {e}")
+    return list(Config.WATCHLIST_STOCKS)
+
+
+if __name__ == '__main__':
+    from candle_store import CandleStore
+    from dhan_client import DhanClient
+
+    logging.basicConfig(level=logging.INFO)
+    screener = UniverseScreener(CandleStore(), DhanClient())
+    result = screener.screen()
+    print(f"Wrote {screener.save(result)}: {[w['symbol'] for w in result['watchlist']]}")
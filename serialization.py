@@ -0,0 +1,72 @@
+import numpy as np
+import orjson
+from datetime import date, datetime
+from typing import TYPE_CHECKING, Any, Dict, List
+from starlette.responses import JSONResponse
+
+if TYPE_CHECKING:  # pandas is imported lazily to keep API startup light
+    import pandas as pd
+
+ORJSON_OPTIONS = orjson.OPT_SERIALIZE_NUMPY | orjson.OPT_NON_STR_KEYS
+
+CANDLE_COLUMNS = {'open': 'o', 'high': 'h', 'low': 'l', 'close': 'c', 'volume': 'v', 'SMA_50': 'sma'}
+
+
+def _default(obj: Any):
+    """Fallback for types orjson does not handle natively"""
+    if isinstance(obj, (datetime, date)):  # includes pd.Timestamp
+        return obj.isoformat()
+    if isinstance(obj, np.generic):
+        return obj.item()
+    if isinstance(obj, np.ndarray):
+        return obj.tolist()
+    if hasattr(obj, 'to_numpy'):  # pd.Series / pd.Index
+        return obj.to_numpy()
+    raise TypeError(f"Type is not JSON serializable: {type(obj).__name__}")
+
+
+def dumps(content: Any) -> bytes:
+    return orjson.dumps(content, default=_default, option=ORJSON_OPTIONS)
+
+
+class FastJSONResponse(JSONResponse):
+    """orjson-backed response; return it directly to skip FastAPI's jsonable_encoder"""
+    media_type = "application/json"
+
+    def render(self, content: Any) -> bytes:
+        return dumps(content)
+
+
+def epoch_seconds(ts: 'pd.Series') -> np.ndarray:
+    import pandas as pd
+    ts = pd.to_datetime(ts)
+    if ts.dt.tz is not None:
+        ts = ts.dt.tz_convert('UTC').dt.tz_localize(None)
+    return ts.to_numpy(dtype='datetime64[s]').astype(np.int64)
+
+
+def candles_to_columns(df: 'pd.DataFrame', decimals: int = 2) -> Dict[str, np.ndarray]:
+    """Column-oriented candle payload: epoch seconds + rounded OHLCV(+SMA) arrays"""
+    if df is None or df.empty:
+        return {'t': []}
+
+    payload = {'t': epoch_seconds(df['timestamp'])}
+    for col, key in CANDLE_COLUMNS.items():
+        if col in df.columns:
+            values = np.ascontiguousarray(df[col].to_numpy(dtype=np.float64))
+            payload[key] = values if col == 'volume' else np.round(values, decimals)
+    return payload
+
+
+def trades_to_columns(trades: List[Dict]) -> Dict[str, list]:
+    """Transpose a list of trade dicts into per-field lists (one key per column)"""
+    if not trades:
+        return {}
+    columns = {key: [] for key in trades[0]}
+    for trade in trades:
+        for key, values in columns.items():
+            value = trade.get(key)
+            if isinstance(value, datetime):
+                value = int(value.timestamp())
+            values.append(value)
+    return columns
@@ -66,6 +66,7 @@ function displayBacktestResults(results) {
 
         const winRateColor = winRate >= 50 ? 'positive' : 'negative';
         const pnlColor = result.total_pnl >= 0 ? 'positive' : 'negative';
+        const netPnlColor = (result.net_pnl ?? result.total_pnl) >= 0 ? 'positive' : 'negative';
 
         // Add summary card
         html += `
@@ -74,7 +75,9 @@ function displayBacktestResults(results) {
                 <div class="metric-label">
                     Trades: ${result.total_trades}<br>
                     Win Rate: <span class="${winRateColor}">${winRate}%</span><br>
-                    P&L: <span class="${pnlColor}">₹${result.total_pnl?.toFixed(2) || 0}</span>
+                    Gross P&L: <span class="${pnlColor}">₹${result.total_pnl?.toFixed(2) || 0}</span><br>
+                    Net P&L: <span class="${netPnlColor}">₹${result.net_pnl?.toFixed(2) || 0}</span>
+                    (costs ₹${((result.total_charges || 0) + (result.total_slippage || 0)).toFixed(2)})
                 </div>
             </div>
         `;
@@ -154,10 +157,26 @@ async function loadStrategyPerformance() {
                     <div class="metric-label">Win Rate</div>
                 </div>
                 <div class="metric-card">
-                    <div class="metric-value ${data.overall_pnl >= 0 ? 'positive' : 'negative'}">
-                        ₹${data.overall_pnl}
+                    <div class="metric-value ${data.overall_pnl_net >= 0 ? 'positive' : 'negative'}">
+                        ₹${data.overall_pnl_net}
                     </div>
-                    <div class="metric-label">Total P&L</div>
+                    <div class="metric-label">Net P&L (gross ₹${data.overall_pnl_gross})</div>
+                </div>
+                <div class="metric-card">
+                    <div class="metric-value negative">₹${data.max_drawdown}</div>
+                    <div class="metric-label">Max Drawdown</div>
+                </div>
+                <div class="metric-card">
+                    <div class="metric-value">${data.sharpe_ratio ?? '-'}</div>
+                    <div class="metric-label">Sharpe (daily, ann.)</div>
+                </div>
+                <div class="metric-card">
+                    <div class="metric-value">${data.profit_factor ?? '-'}</div>
+                    <div class="metric-label">Profit Factor</div>
+                </div>
+                <div class="metric-card">
+                    <div class="metric-value">${data.max_win_streak ?? '-'} / ${data.max_loss_streak ?? '-'}</div>
+                    <div class="metric-label">Win / Loss Streak</div>
                 </div>
             </div>
         `;
@@ -189,6 +208,114 @@ async function loadStrategyPerformance() {
     }
 }
 
+// Live chart (initial downsampled view + incremental deltas)
+let chartState = null;
+let chartTimer = null;
+
+async function loadChart() {
+    const symbol = document.getElementById('chartSymbol').value;
+    const days = document.getElementById('chartDays').value;
+    const canvas = document.getElementById('chartCanvas');
+
+    try {
+        const response = await fetch(`/api/chart/${symbol}?days=${days}&max_points=${canvas.width >> 1}`);
+        const data = await response.json();
+        if (data.error) {
+            showAlert(data.error, 'error');
+            return;
+        }
+        chartState = { ...data, days };
+        drawChart();
+
+        clearInterval(chartTimer);
+        chartTimer = setInterval(pollChartDelta, 30000);
+    } catch (error) {
+        showAlert('Error loading chart', 'error');
+    }
+}
+
+async function pollChartDelta() {
+    if (!chartState || !document.getElementById('chart').classList.contains('active')) return;
+
+    const { symbol, seq, days } = chartState;
+    const response = await fetch(`/api/chart/${symbol}/delta?since=${seq}&days=${days}`);
+    const delta = await response.json();
+    if (delta.error) return;
+    if (delta.epoch !== chartState.epoch) {
+        loadChart();  // server state was rebuilt, start over
+        return;
+    }
+
+    // Replace changed bars in place, append new ones (t is sorted)
+    const fields = ['t', 'o', 'h', 'l', 'c', 'v', 'sma'];
+    delta.t.forEach((t, k) => {
+        let idx = chartState.t.lastIndexOf(t);
+        if (idx === -1) {
+            if (chartState.downsampled && t <= chartState.t[chartState.t.length - 1]) return;
+            idx = chartState.t.length;
+        }
+        fields.forEach(f => { chartState[f][idx] = delta[f][k]; });
+    });
+    chartState.seq = delta.seq;
+    chartState.markers = delta.markers;
+    drawChart();
+}
+
+function drawChart() {
+    const canvas = document.getElementById('chartCanvas');
+    const ctx = canvas.getContext('2d');
+    const { t, o, h, l, c, sma, markers } = chartState;
+    const n = t.length;
+    ctx.clearRect(0, 0, canvas.width, canvas.height);
+    if (!n) return;
+
+    const pad = 40;
+    const lows = l.concat(sma.filter(v => v !== null));
+    const highs = h.concat(sma.filter(v => v !== null));
+    const min = Math.min(...lows), max = Math.max(...highs);
+    const x = i => pad + (i + 0.5) * (canvas.width - 2 * pad) / n;
+    const y = p => canvas.height - pad - (p - min) / ((max - min) || 1) * (canvas.height - 2 * pad);
+    const barWidth = Math.max(1, (canvas.width - 2 * pad) / n * 0.7);
+
+    for (let i = 0; i < n; i++) {
+        ctx.strokeStyle = ctx.fillStyle = c[i] >= o[i] ? '#28a745' : '#dc3545';
+        ctx.beginPath();
+        ctx.moveTo(x(i), y(h[i]));
+        ctx.lineTo(x(i), y(l[i]));
+        ctx.stroke();
+        ctx.fillRect(x(i) - barWidth / 2, y(Math.max(o[i], c[i])), barWidth,
+                     Math.max(1, Math.abs(y(o[i]) - y(c[i]))));
+    }
+
+    ctx.strokeStyle = '#2a5298';
+    ctx.lineWidth = 1.5;
+    ctx.beginPath();
+    let started = false;
+    for (let i = 0; i < n; i++) {
+        if (sma[i] === null) continue;
+        started ? ctx.lineTo(x(i), y(sma[i])) : ctx.moveTo(x(i), y(sma[i]));
+        started = true;
+    }
+    ctx.stroke();
+    ctx.lineWidth = 1;
+
+    // Markers snap to the (possibly downsampled) bar containing their timestamp
+    (markers || []).forEach(m => {
+        let i = t.findIndex(ts => ts > m.t) - 1;
+        if (i < 0) i = m.t >= t[0] ? n - 1 : 0;
+        const isSetup = m.type.endsWith('SETUP');
+        ctx.fillStyle = isSetup ? '#ffc107' : '#6f42c1';
+        ctx.beginPath();
+        ctx.arc(x(i), y(m.price), isSetup ? 4 : 5, 0, 2 * Math.PI);
+        ctx.fill();
+    });
+
+    ctx.fillStyle = '#333';
+    ctx.fillText(`${chartState.symbol}  ${chartState.bars} bars${chartState.downsampled ? ' (downsampled)' : ''}`, pad, 20);
+    ctx.fillText(max.toFixed(2), 2, pad);
+    ctx.fillText(min.toFixed(2), 2, canvas.height - pad);
+}
+
 // Utility functions
 function showTab(tabName) {
     document.querySelectorAll('.tab-content').forEach(tab => tab.classList.remove('active'));
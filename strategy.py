@@ -1,6 +1,7 @@
 import pandas as pd
 from typing import Dict, Optional
 from config import Config
+from instruments import round_to_tick
 
 class TradingStrategy:
     def __init__(self):
@@ -71,18 +72,21 @@ class TradingStrategy:
 
         return None
 
-    def calculate_entry_exit(self, rejection_candle: Dict, setup_type: str) -> Dict:
+    def calculate_entry_exit(self, rejection_candle: Dict, setup_type: str,
+                             tick_size: Optional[float] = None) -> Dict:
+        """Entry/stop one tick beyond the rejection candle, target at RR; all on the tick grid"""
+        tick = tick_size or self.config.DEFAULT_TICK_SIZE
         candle = rejection_candle['candle']
         candle_size = candle['high'] - candle['low']
 
         if setup_type == "LONG_SETUP":
-            entry_price = candle['high'] + 0.01
-            stop_loss = candle['low'] - 0.01
-            target_price = entry_price + (candle_size * self.RR)
+            entry_price = round_to_tick(candle['high'] + tick, tick, "up")
+            stop_loss = round_to_tick(candle['low'] - tick, tick, "down")
+            target_price = round_to_tick(entry_price + (candle_size * self.RR), tick)
         else:
-            entry_price = candle['low'] - 0.01
-            stop_loss = candle['high'] + 0.01
-            target_price = entry_price - (candle_size * self.RR)
+            entry_price = round_to_tick(candle['low'] - tick, tick, "down")
+            stop_loss = round_to_tick(candle['high'] + tick, tick, "up")
+            target_price = round_to_tick(entry_price - (candle_size * self.RR), tick)
 
         return {
             'entry_price': entry_price,
@@ -0,0 +1,30 @@
+from datetime import date
+
+import pandas as pd
+
+from instruments import InstrumentIndex, normalize_scrip_master
+
+
+def _scrip_master(rows):
+    columns = ['SEM_EXM_EXCH_ID', 'SEM_SMST_SECURITY_ID', 'SEM_TRADING_SYMBOL', 'SEM_INSTRUMENT_NAME',
+               'SEM_EXPIRY_DATE', 'SEM_STRIKE_PRICE', 'SEM_OPTION_TYPE', 'SEM_LOT_UNITS', 'SEM_TICK_SIZE',
+               'SEM_SERIES']
+    return pd.DataFrame(rows, columns=columns)
+
+
+def test_weekly_expiries_sharing_a_month_symbol_are_kept():
+    raw = _scrip_master([
+        ('NSE', '2885', 'RELIANCE', 'EQUITY', None, None, None, 1, 5, 'EQ'),
+        ('NSE', '50001', 'RELIANCE-OCT2025-2800-CE', 'OPTSTK', '2025-10-07 14:30:00', 2800, 'CE', 500, 5, None),
+        ('NSE', '50002', 'RELIANCE-OCT2025-2800-CE', 'OPTSTK', '2025-10-14 14:30:00', 2800, 'CE', 500, 5, None),
+        ('NSE', '50003', 'RELIANCE-OCT2025-2900-CE', 'OPTSTK', '2025-10-14 14:30:00', 2900, 'CE', 500, 5, None),
+    ])
+    index = InstrumentIndex(normalize_scrip_master(raw))
+
+    assert len(index) == 4
+    assert [e.astype(date) for e in index.expiries('RELIANCE')] == [date(2025, 10, 7), date(2025, 10, 14)]
+    assert index.nearest_expiry('RELIANCE', as_of=date(2025, 10, 1)) == date(2025, 10, 7)
+    assert index.atm_option('RELIANCE', 2810, 'CE', as_of=date(2025, 10, 1)).security_id == '50001'
+    assert index.atm_option('RELIANCE', 2810, 'CE', as_of=date(2025, 10, 8)).security_id == '50002'
+    assert index.security_id_for('RELIANCE') == '2885'
+    assert index.get('RELIANCE-OCT2025-2800-CE') is None  # ambiguous across weeklies
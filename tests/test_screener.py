@@ -0,0 +1,27 @@
+import pandas as pd
+
+from instruments import from_legacy_master, normalize_scrip_master
+from screener import equity_universe
+from test_instruments import _scrip_master
+
+
+def test_equity_universe_keeps_only_eq_series_stocks():
+    raw = _scrip_master([
+        ('NSE', '2885', 'RELIANCE', 'EQUITY', None, None, None, 1, 5, 'EQ'),
+        ('NSE', '11536', 'TCS', 'EQUITY', None, None, None, 1, 5, 'EQ'),
+        ('NSE', '1001', 'AAFS28A', 'EQUITY', None, None, None, 1, 1, 'N1'),  # NCD tranches
+        ('NSE', '1002', 'AAFS28B', 'EQUITY', None, None, None, 1, 1, 'N2'),
+        ('NSE', '1003', 'BBETF0432', 'EQUITY', None, None, None, 1, 1, 'EQ'),  # bond ETF
+        ('NSE', '1004', 'BPF01D1D', 'EQUITY', None, None, None, 1, 1, 'MF'),  # MF units
+        ('NSE', '25', 'BANKNIFTY1', 'INDEX', None, None, None, 1, 5, None),
+        ('NSE', '60001', 'RELIANCE-OCT2025-FUT', 'FUTSTK', '2025-10-28', None, None, 500, 10, None),
+        ('NSE', '60002', 'TCS-OCT2025-FUT', 'FUTSTK', '2025-10-28', None, None, 175, 10, None),
+        ('NSE', '60003', 'TCS-NOV2025-FUT', 'FUTSTK', '2025-11-25', None, None, 175, 10, None),
+    ])
+    assert equity_universe(normalize_scrip_master(raw)) == ['RELIANCE', 'TCS']
+
+
+def test_legacy_master_guesses_the_series():
+    legacy = pd.DataFrame({'security_id': ['2885', '25', '1003', '60001', '2000'],
+                           'symbol': ['RELIANCE', 'BANKNIFTY1', 'BBETF0432', 'RELIANCE-OCT2025-FUT', 'BAJAJ-AUTO']})
+    assert equity_universe(from_legacy_master(legacy)) == ['BAJAJ-AUTO', 'RELIANCE']
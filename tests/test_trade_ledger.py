@@ -0,0 +1,77 @@
+import time
+from datetime import date, timedelta
+
+import numpy as np
+import pandas as pd
+
+from performance import performance_report, summary_report
+from trade_ledger import TradeLedger
+
+N_TRADES = 50_000
+SYMBOLS = ['RELIANCE', 'TCS', 'INFY', 'HDFCBANK', 'SBIN']
+
+
+def _trades(n, seed=7):
+    rng = np.random.default_rng(seed)
+    start = pd.Timestamp('2024-01-01 09:30', tz='Asia/Kolkata')
+    pnl = np.round(rng.normal(5, 100, n), 2)
+    charges = np.round(rng.uniform(5, 30, n), 2)
+    trades = []
+    for k in range(n):
+        entry = start + pd.Timedelta(days=k // 100, minutes=3 * (k % 100))
+        trades.append({
+            'status': 'CLOSED', 'symbol': SYMBOLS[k % len(SYMBOLS)], 'signal': 'BUY',
+            'entry_time': entry, 'exit_time': entry + pd.Timedelta(minutes=2),
+            'entry_price': 100.0, 'exit_price': 101.0, 'stop_loss': 99.0, 'target_price': 102.0,
+            'quantity': 10, 'pnl': pnl[k], 'exit_reason': 'TARGET',
+            'charges': charges[k], 'slippage': 1.0, 'net_pnl': pnl[k] - charges[k] - 1.0,
+        })
+    return trades
+
+
+def test_summary_tables_match_the_trades(tmp_path):
+    ledger = TradeLedger(str(tmp_path / 'ledger.db'))
+    trades = _trades(2_000)
+    ledger.append(trades)
+    ledger.append(trades[:500])  # re-run over the same sessions updates in place
+
+    by_day = {row['day']: row for row in ledger.aggregate('day')}
+    assert sum(row['total_trades'] for row in by_day.values()) == 2_000
+    assert round(sum(row['net_pnl'] for row in by_day.values()), 2) == \
+        round(sum(t['net_pnl'] for t in trades), 2)
+
+    # a filter the summary tables can't serve falls back to the trades table
+    tcs = ledger.aggregate('symbol', symbol='TCS', start_date=date(2024, 1, 3))
+    expected = [t for t in trades if t['symbol'] == 'TCS' and t['entry_time'].date() >= date(2024, 1, 3)]
+    assert tcs[0]['total_trades'] == len(expected)
+    ledger.close()
+
+
+def test_history_report_matches_trade_resolution(tmp_path):
+    ledger = TradeLedger(str(tmp_path / 'ledger.db'))
+    ledger.append(_trades(2_000))
+
+    full = performance_report(ledger.arrays())
+    summary = summary_report(ledger.totals('day'), ledger.totals('symbol'))
+    for key in ('total_trades', 'winning_trades', 'losing_trades', 'total_pnl', 'profit_factor',
+                'trading_days', 'sharpe_ratio', 'sortino_ratio', 'best_day', 'worst_day'):
+        assert summary[key] == full[key], key
+    assert summary['by_symbol'] == full['by_symbol']
+    assert summary['max_drawdown'] <= full['max_drawdown']  # daily closes hide intraday dips
+    ledger.close()
+
+
+def test_history_report_time_is_bounded(tmp_path):
+    ledger = TradeLedger(str(tmp_path / 'ledger.db'))
+    ledger.append(_trades(N_TRADES))
+
+    started = time.perf_counter()
+    for _ in range(5):
+        report = summary_report(ledger.totals('day'), ledger.totals('symbol'))
+        ledger.aggregate('exit_reason', start_date=date(2024, 1, 1) + timedelta(days=10))
+    elapsed = (time.perf_counter() - started) / 5
+
+    assert report['total_trades'] == N_TRADES
+    # reads a few hundred summary rows, not N_TRADES trades
+    assert elapsed < 0.25, f"{elapsed:.3f}s per report"
+    ledger.close()
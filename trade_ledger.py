@@ -0,0 +1,284 @@
+import sqlite3
+import threading
+import logging
+from datetime import date
+from typing import Dict, List, Optional
+import numpy as np
+import pandas as pd
+from config import Config
+
+logger = logging.getLogger(__name__)
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS trades (
+    id           INTEGER PRIMARY KEY AUTOINCREMENT,
+    source       TEXT    NOT NULL,
+    symbol       TEXT    NOT NULL,
+    signal       TEXT    NOT NULL,
+    trade_date   TEXT    NOT NULL,
+    entry_ts     INTEGER NOT NULL,
+    exit_ts      INTEGER NOT NULL,
+    entry_price  REAL    NOT NULL,
+    exit_price   REAL    NOT NULL,
+    stop_loss    REAL    NOT NULL,
+    target_price REAL    NOT NULL,
+    quantity     INTEGER NOT NULL,
+    pnl          REAL    NOT NULL,
+    exit_reason  TEXT    NOT NULL,
+    slippage     REAL    NOT NULL DEFAULT 0,
+    charges      REAL    NOT NULL DEFAULT 0,
+    net_pnl      REAL    NOT NULL DEFAULT 0
+);
+CREATE INDEX IF NOT EXISTS idx_trades_symbol_date ON trades (symbol, trade_date);
+CREATE INDEX IF NOT EXISTS idx_trades_date ON trades (trade_date);
+CREATE INDEX IF NOT EXISTS idx_trades_exit_reason ON trades (exit_reason);
+CREATE INDEX IF NOT EXISTS idx_trades_source ON trades (source);
+"""
+
+# A trade is identified by symbol, entry bar and direction, whichever run (backtest / eod) produced it
+TRADE_KEY = ('symbol', 'entry_ts', 'signal')
+
+TRADE_COLUMNS = [
+    'id', 'source', 'symbol', 'signal', 'trade_date', 'entry_ts', 'exit_ts',
+    'entry_price', 'exit_price', 'stop_loss', 'target_price', 'quantity',
+    'pnl', 'exit_reason', 'slippage', 'charges', 'net_pnl',
+]
+
+# Running totals kept by triggers, one row per combination of the table's dimensions.
+# aggregate() reads these whenever the group-by and filter columns are all dimensions.
+SUMMARY_TABLES = {
+    'trades_daily': ('trade_date', 'source', 'exit_reason'),
+    'trades_by_symbol': ('symbol', 'source', 'exit_reason'),
+}
+
+# Summary column -> expression over one trades row (`{r}` is NEW / OLD / trades)
+SUMMARY_MEASURES = {
+    'trades': '1',
+    'wins': '{r}.pnl > 0',
+    'losses': '{r}.pnl < 0',
+    'pnl': '{r}.pnl',
+    'net_pnl': '{r}.net_pnl',
+    'costs': '{r}.charges + {r}.slippage',
+    'charges': '{r}.charges',
+    'slippage': '{r}.slippage',
+    'net_wins': '{r}.net_pnl > 0',
+    'net_losses': '{r}.net_pnl < 0',
+    'net_win_pnl': 'MAX({r}.net_pnl, 0)',
+    'net_loss_pnl': 'MIN({r}.net_pnl, 0)',
+}
+
+GROUP_BY_COLUMNS = {'day': 'trade_date', 'symbol': 'symbol', 'exit_reason': 'exit_reason'}
+FILTER_COLUMNS = {'symbol': 'symbol', 'start_date': 'trade_date', 'end_date': 'trade_date',
+                  'exit_reason': 'exit_reason', 'source': 'source'}
+
+
+def _to_epoch(ts) -> int:
+    return int(pd.Timestamp(ts).timestamp())
+
+
+def _summary_upsert(table: str, row: str, sign: str = "") -> str:
+    dims = SUMMARY_TABLES[table]
+    return (f"INSERT INTO {table} ({', '.join(dims + tuple(SUMMARY_MEASURES))}) VALUES ("
+            f"{', '.join(f'{row}.{d}' for d in dims)}, "
+            f"{', '.join(f'{sign}({e.format(r=row)})' for e in SUMMARY_MEASURES.values())}) "
+            f"ON CONFLICT ({', '.join(dims)}) DO UPDATE SET "
+            f"{', '.join(f'{m} = {m} + excluded.{m}' for m in SUMMARY_MEASURES)};")
+
+
+def _summary_schema(table: str) -> str:
+    """Summary table plus the insert / update / delete triggers that keep it in step with trades"""
+    dims = SUMMARY_TABLES[table]
+    columns = [f"{d} TEXT NOT NULL" for d in dims] + [f"{m} REAL NOT NULL DEFAULT 0" for m in SUMMARY_MEASURES]
+    return f"""
+CREATE TABLE {table} ({', '.join(columns)}, PRIMARY KEY ({', '.join(dims)})) WITHOUT ROWID;
+INSERT INTO {table} SELECT {', '.join(dims)}, {', '.join(f"SUM({e.format(r='trades')})"
+                                                       for e in SUMMARY_MEASURES.values())}
+    FROM trades GROUP BY {', '.join(dims)};
+CREATE TRIGGER {table}_insert AFTER INSERT ON trades BEGIN {_summary_upsert(table, 'NEW')} END;
+CREATE TRIGGER {table}_delete AFTER DELETE ON trades BEGIN {_summary_upsert(table, 'OLD', '-')} END;
+CREATE TRIGGER {table}_update AFTER UPDATE ON trades BEGIN
+    {_summary_upsert(table, 'OLD', '-')} {_summary_upsert(table, 'NEW')} END;
+"""
+
+
+class TradeLedger:
+    """SQLite store of every closed backtest / live trade, one row per TRADE_KEY"""
+
+    def __init__(self, path: Optional[str] = None):
+        self.path = path or Config.TRADE_LEDGER_PATH
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(self.path, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.executescript(SCHEMA)
+        self._migrate()
+
+    def _migrate(self):
+        existing = {row[0] for row in self._conn.execute("SELECT name FROM sqlite_master")}
+        if 'idx_trades_key' not in existing:
+            # Ledgers written before TRADE_KEY existed hold repeated runs: keep the first copy
+            key = ", ".join(TRADE_KEY)
+            with self._conn:
+                removed = self._conn.execute(
+                    f"DELETE FROM trades WHERE id NOT IN (SELECT MIN(id) FROM trades GROUP BY {key})").rowcount
+                if removed:
+                    logger.info(f"Ledger: removed {removed} duplicate trades")
+                self._conn.execute(f"CREATE UNIQUE INDEX idx_trades_key ON trades ({key})")
+        for table, dims in SUMMARY_TABLES.items():
+            columns = [row[1] for row in self._conn.execute(f"PRAGMA table_info({table})")]
+            if columns == list(dims + tuple(SUMMARY_MEASURES)):
+                continue
+            # Missing, or built before a measure was added: rebuild from trades
+            drop = "".join(f"DROP TRIGGER IF EXISTS {table}_{event}; " for event in ('insert', 'delete', 'update'))
+            self._conn.executescript(f"BEGIN; {drop}DROP TABLE IF EXISTS {table}; {_summary_schema(table)} COMMIT;")
+
+    # =======================================================
+    # Writes
+    # =======================================================
+    def append(self, trades: List[Dict], source: str = "backtest") -> int:
+        """Upsert closed trades in a single transaction, returns rows written.
+
+        Re-running a backtest over the same sessions refreshes those trades (exit, PnL, costs)
+        instead of adding copies; the source of the first run is kept.
+        """
+        rows = []
+        for t in trades:
+            if t.get('status') != 'CLOSED':
+                continue
+            entry_time = pd.Timestamp(t['entry_time'])
+            rows.append((
+                source, t['symbol'], t['signal'], entry_time.date().isoformat(),
+                _to_epoch(entry_time), _to_epoch(t['exit_time']),
+                float(t['entry_price']), float(t['exit_price']),
+                float(t['stop_loss']), float(t['target_price']),
+                int(t['quantity']), float(t['pnl']), t['exit_reason'],
+                float(t.get('slippage', 0)), float(t.get('charges', 0)),
+                float(t.get('net_pnl', t['pnl'])),
+            ))
+        if not rows:
+            return 0
+
+        with self._lock, self._conn:
+            self._conn.executemany(
+                "INSERT INTO trades (source, symbol, signal, trade_date, entry_ts, exit_ts, "
+                "entry_price, exit_price, stop_loss, target_price, quantity, pnl, exit_reason, "
+                "slippage, charges, net_pnl) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?) "
+                f"ON CONFLICT ({', '.join(TRADE_KEY)}) DO UPDATE SET "
+                "exit_ts = excluded.exit_ts, entry_price = excluded.entry_price, "
+                "exit_price = excluded.exit_price, stop_loss = excluded.stop_loss, "
+                "target_price = excluded.target_price, quantity = excluded.quantity, pnl = excluded.pnl, "
+                "exit_reason = excluded.exit_reason, slippage = excluded.slippage, "
+                "charges = excluded.charges, net_pnl = excluded.net_pnl",
+                rows,
+            )
+        logger.info(f"Ledger: wrote {len(rows)} {source} trades")
+        return len(rows)
+
+    # =======================================================
+    # Reads
+    # =======================================================
+    @staticmethod
+    def _where(symbol: Optional[str] = None, start_date: Optional[date] = None,
+               end_date: Optional[date] = None, exit_reason: Optional[str] = None,
+               source: Optional[str] = None):
+        clauses, params = [], []
+        if symbol:
+            clauses.append("symbol = ?")
+            params.append(symbol.strip().upper())
+        if start_date:
+            clauses.append("trade_date >= ?")
+            params.append(str(start_date))
+        if end_date:
+            clauses.append("trade_date <= ?")
+            params.append(str(end_date))
+        if exit_reason:
+            clauses.append("exit_reason = ?")
+            params.append(exit_reason)
+        if source:
+            clauses.append("source = ?")
+            params.append(source)
+        where = (" WHERE " + " AND ".join(clauses)) if clauses else ""
+        return where, params
+
+    def query(self, page: int = 1, page_size: int = 100, **filters) -> Dict:
+        """Paginated trade listing, newest first"""
+        page = max(1, page)
+        page_size = max(1, min(page_size, Config.TRADE_LEDGER_MAX_PAGE_SIZE))
+        where, params = self._where(**filters)
+
+        with self._lock:
+            total = self._conn.execute(f"SELECT COUNT(*) FROM trades{where}", params).fetchone()[0]
+            rows = self._conn.execute(
+                f"SELECT {', '.join(TRADE_COLUMNS)} FROM trades{where} "
+                f"ORDER BY trade_date DESC, id DESC LIMIT ? OFFSET ?",
+                params + [page_size, (page - 1) * page_size],
+            ).fetchall()
+
+        return {
+            'page': page,
+            'page_size': page_size,
+            'total': total,
+            'trades': [dict(zip(TRADE_COLUMNS, r)) for r in rows],
+        }
+
+    def arrays(self, **filters) -> Dict[str, np.ndarray]:
+        """Closed trades as columnar arrays (see performance.trade_arrays), ordered by exit time"""
+        where, params = self._where(**filters)
+        with self._lock:
+            rows = self._conn.execute(
+                f"SELECT exit_ts, symbol, pnl, net_pnl, charges, slippage FROM trades{where} "
+                f"ORDER BY exit_ts, id", params,
+            ).fetchall()
+        df = pd.DataFrame(rows, columns=['exit_ts', 'symbol', 'pnl', 'net_pnl', 'charges', 'slippage'])
+        codes, symbols = pd.factorize(df['symbol'])
+        return {
+            'exit_ts': df['exit_ts'].to_numpy(dtype=np.int64),
+            'symbol_code': codes.astype(np.int64),
+            'symbols': np.asarray(symbols, dtype=object),
+            **{k: df[k].to_numpy(dtype=np.float64) for k in ('pnl', 'net_pnl', 'charges', 'slippage')},
+        }
+
+    def _summary_table(self, key: str, filters: Dict) -> Optional[str]:
+        needed = {key} | {FILTER_COLUMNS[k] for k, v in filters.items() if v}
+        return next((t for t, dims in SUMMARY_TABLES.items() if needed <= set(dims)), None)
+
+    def totals(self, by: str = "day", **filters) -> Dict[str, np.ndarray]:
+        """SUMMARY_MEASURES summed per group, as arrays.
+
+        Served from a summary table when the group-by and filters allow it (a few thousand
+        rows at most), else from a scan of the matching trades.
+        """
+        if by not in GROUP_BY_COLUMNS:
+            raise ValueError(f"Unsupported group-by '{by}', expected one of {list(GROUP_BY_COLUMNS)}")
+        key = GROUP_BY_COLUMNS[by]
+        table = self._summary_table(key, filters)
+        where, params = self._where(**filters)
+        if table:
+            sums, having = ", ".join(f"SUM({m})" for m in SUMMARY_MEASURES), " HAVING SUM(trades) > 0"
+        else:
+            table, having = "trades", ""
+            sums = ", ".join(f"SUM({e.format(r='trades')})" for e in SUMMARY_MEASURES.values())
+
+        with self._lock:
+            rows = self._conn.execute(
+                f"SELECT {key}, {sums} FROM {table}{where} GROUP BY {key}{having} ORDER BY {key}", params,
+            ).fetchall()
+
+        values = np.array([r[1:] for r in rows], dtype=np.float64).reshape(len(rows), len(SUMMARY_MEASURES))
+        return {by: np.array([r[0] for r in rows], dtype=object),
+                **{m: values[:, k] for k, m in enumerate(SUMMARY_MEASURES)}}
+
+    def aggregate(self, by: str = "day", **filters) -> List[Dict]:
+        """Trade count, wins and PnL grouped by day, symbol or exit_reason"""
+        totals = self.totals(by, **filters)
+        return [
+            {by: group, 'total_trades': int(n), 'winning_trades': int(w), 'losing_trades': int(l),
+             'total_pnl': round(float(p), 2), 'net_pnl': round(float(net), 2), 'total_costs': round(float(c), 2)}
+            for group, n, w, l, p, net, c in zip(totals[by], totals['trades'], totals['wins'], totals['losses'],
+                                                 totals['pnl'], totals['net_pnl'], totals['costs'])
+        ]
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
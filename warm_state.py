@@ -0,0 +1,49 @@
+import os
+import json
+import time
+import logging
+import numpy as np
+from typing import Dict, Optional
+from config import Config
+
+logger = logging.getLogger(__name__)
+
+SERIES_FIELDS = ('t', 'o', 'h', 'l', 'c', 'v', 'sma')
+
+
+def save_snapshot(security_ids: Dict[str, str], chart_series: Dict, path: Optional[str] = None) -> str:
+    """Persist resolved security IDs and chart candle/SMA arrays to one compressed .npz"""
+    path = path or Config.WARM_STATE_PATH
+    meta = {
+        'saved_at': time.time(),
+        'security_ids': security_ids,
+        'series': {sym: {'markers': s.markers} for sym, s in chart_series.items()},
+    }
+    arrays = {f"{sym}/{k}": s.arrays[k] for sym, s in chart_series.items() for k in SERIES_FIELDS}
+
+    tmp = path + ".tmp.npz"
+    np.savez_compressed(tmp, __meta__=np.frombuffer(json.dumps(meta).encode(), dtype=np.uint8), **arrays)
+    os.replace(tmp, path)
+    logger.info(f"Warm state saved: {len(security_ids)} security IDs, {len(chart_series)} chart series")
+    return path
+
+
+def load_snapshot(path: Optional[str] = None) -> Optional[Dict]:
+    """Return {'security_ids', 'series': {symbol: {arrays..., 'markers'}}} or None if unusable"""
+    path = path or Config.WARM_STATE_PATH
+    if not os.path.exists(path):
+        return None
+    try:
+        with np.load(path) as data:
+            meta = json.loads(data['__meta__'].tobytes())
+            if time.time() - meta['saved_at'] > Config.WARM_STATE_MAX_AGE_HOURS * 3600:
+                logger.info("Warm state snapshot is stale, ignoring")
+                return None
+            series = {
+                sym: {**{k: data[f"{sym}/{k}"] for k in SERIES_FIELDS}, 'markers': info['markers']}
+                for sym, info in meta['series'].items()
+            }
+    except Exception as e:
+        logger.warning(f"Could not load warm state snapshot: {e}")
+        return None
+    return {'security_ids': meta['security_ids'], 'series': series}